@@ -1,13 +1,14 @@
-from typing import List, Any, Literal, Dict
+from typing import List, Any, Literal, Dict, Tuple, TYPE_CHECKING
 import os, sys
+import functools
+import importlib
+from types import MappingProxyType
 from pathlib import Path, PurePath
 import click
 
 import logging
-import yaml
 from enum import Enum
 
-
 log = logging.getLogger(__name__)
 
 if __name__ == "__main__":
@@ -17,51 +18,68 @@ if __name__ == "__main__":
     MODULE_ROOT_DIR = os.path.join(SCRIPT_DIR, "..")
     sys.path.insert(0, os.path.normpath(MODULE_ROOT_DIR))
 
-from hsbt.connection_manager import ConnectionManager
-from hsbt.storage_box_manager import HetznerStorageBox, CommandResult
-from hsbt.key_manager import KeyManager
 from hsbt.utils import is_root, cast_path
 from hsbt.env_var_names import EnvVarNames, EXECUTABLE_PATH_ENV_VAR_MAPPING
-from hsbt.rclone_manager import Rclone
+
+if TYPE_CHECKING:
+    # heavy modules are imported inside the commands that need them, to keep cli startup fast
+    from hsbt.storage_box_manager import HetznerStorageBox
+
+DEFAULT_CONFIG_FILE_PATH = (
+    "/etc/hetzner_sbt_connections.json"
+    if is_root()
+    else "~/.config/hetzner_sbt_connections.json"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _env_path(env_var_name: str) -> Path | None:
+    value = os.getenv(env_var_name, default=None)
+    return cast_path(value) if value else None
+
+
+def _resolve_path(
+    caller_param_path: None | str | Path,
+    env_var: EnvVarNames,
+    central_dir_sub_path: Tuple[str, ...],
+) -> Path | None:
+    """Resolve a path by priority: caller parameter, dedicated env var, subpath of the central config dir"""
+    path = cast_path(caller_param_path) or _env_path(env_var.value)
+    if path:
+        return path
+    central_dir = os.environ.get(EnvVarNames.CENTRAL_CONFIG_DIR.value)
+    return (
+        cast_path(os.path.join(central_dir, *central_dir_sub_path))
+        if central_dir
+        else None
+    )
 
 
+@functools.lru_cache(maxsize=None)
 def get_config_file_path(caller_param_config_file_path: None | str | Path) -> Path:
-    config_file_path: Path = cast_path(caller_param_config_file_path)
-    if caller_param_config_file_path is None:
-        config_file_path = cast_path(
-            os.getenv(EnvVarNames.CONNECTION_CONFIG_FILE, default=None)
-        )
-    central_dir = os.getenv(EnvVarNames.CENTRAL_CONFIG_DIR, default=None)
-    if config_file_path is None and central_dir:
-        return cast_path([central_dir, "config", "hetzner_sbt_connections.json"])
-    return config_file_path
+    return _resolve_path(
+        caller_param_config_file_path,
+        EnvVarNames.CONNECTION_CONFIG_FILE,
+        ("config", "hetzner_sbt_connections.json"),
+    )
 
 
+@functools.lru_cache(maxsize=None)
 def get_ssh_dir(caller_param_config_file_path: None | str | Path) -> Path:
-    config_file_path: Path = cast_path(caller_param_config_file_path)
-    if caller_param_config_file_path is None:
-        config_file_path = cast_path(
-            os.getenv(EnvVarNames.SSH_KEY_DIRECTORY, default=None)
-        )
-    central_dir = os.getenv(EnvVarNames.CENTRAL_CONFIG_DIR, default=None)
-    if config_file_path is None and central_dir:
-        return cast_path([central_dir, "ssh"])
-    return config_file_path
+    return _resolve_path(
+        caller_param_config_file_path, EnvVarNames.SSH_KEY_DIRECTORY, ("ssh",)
+    )
 
 
+@functools.lru_cache(maxsize=None)
 def get_rclone_config_file_path(
     caller_param_config_file_path: None | str | Path,
 ) -> Path:
-    config_file_path: Path = cast_path(caller_param_config_file_path)
-    print("caller_param_config_file_path", caller_param_config_file_path)
-    if caller_param_config_file_path is None:
-        config_file_path = cast_path(
-            os.getenv(EnvVarNames.RCLONE_CONFIG_FILE, default=None)
-        )
-    central_dir = os.getenv(EnvVarNames.CENTRAL_CONFIG_DIR, default=None)
-    if config_file_path is None and central_dir:
-        return cast_path([central_dir, "rclone", "rclone.conf"])
-    return config_file_path
+    return _resolve_path(
+        caller_param_config_file_path,
+        EnvVarNames.RCLONE_CONFIG_FILE,
+        ("rclone", "rclone.conf"),
+    )
 
 
 def ssh_dir_callback(
@@ -70,12 +88,16 @@ def ssh_dir_callback(
     return get_ssh_dir(connection_identifier)
 
 
+# connection params that are not needed when a saved connection is referenced via '-i'/'--identifier'
+_PROMPTED_CONNECTION_PARAMS = frozenset({"host", "user", "ssh_key_dir"})
+
+
 def conditonal_connection_prompts(
     ctx: click.Context, param: click.Option, connection_identifier: Any
 ):
-    if not connection_identifier in ["", None]:
+    if connection_identifier:
         for other_param in ctx.command.params:
-            if other_param.name in ["host", "user", "ssh_key_dir"]:
+            if other_param.name in _PROMPTED_CONNECTION_PARAMS:
                 other_param.prompt = None
                 other_param.required = False
                 other_param.default = None
@@ -87,123 +109,181 @@ def conditonal_connection_prompts(
     return connection_identifier
 
 
+_OPTIONAL_HELP_POSTFIX = ". Only required if ('-i'/'--identifier') is empty."
+_SSH_KEY_DIR_HELP = "Directory to store the public-, private-key and known_hosts files."
+_SSH_KEY_DIR_HELP_OPTIONAL = _SSH_KEY_DIR_HELP + _OPTIONAL_HELP_POSTFIX
+_USER_HELP = "The username to connect to the Hetzner storage box. e.g. 'u0000001' or 'u00000001-sub1'"
+_USER_HELP_OPTIONAL = _USER_HELP + _OPTIONAL_HELP_POSTFIX
+_HOST_HELP = "The hostname to reach the reach the Hetzner storage box e.g. 'u000001.your-storagebox.de'"
+_HOST_HELP_OPTIONAL = _HOST_HELP + _OPTIONAL_HELP_POSTFIX
+_REQUIRED_PARAM = MappingProxyType({"required": True})
+_OPTIONAL_PARAM = MappingProxyType({"default": None})
+
+
+@functools.lru_cache(maxsize=None)
+def _connection_option_specs(
+    with_prompting: bool, optional: bool, exlude_params: Tuple[str, ...]
+) -> Tuple[Tuple[Tuple[str, ...], Dict[str, Any]], ...]:
+    """Returns the (param_decls, attrs) pairs for the connection options in the order click expects them in `__click_params__`"""
+    specs = []
+    default_param = _OPTIONAL_PARAM if optional else _REQUIRED_PARAM
+    ###
+    ### force-password-use
+    ###
+    if "force-password-use" not in exlude_params:
+        specs.append(
+            (
+                ("-f", "--force-password-use"),
+                dict(
+                    type=click.BOOL,
+                    is_flag=True,
+                    required=False,
+                    help="To skip ssh key generation and deployment use the flag '-f'. A password must be provided",
+                    default=False,
+                ),
+            )
+        )
+    ###
+    ### password
+    ###
+    if "password" not in exlude_params:
+        specs.append(
+            (
+                ("-p", "--password"),
+                dict(
+                    type=click.STRING,
+                    hide_input=True,
+                    required=False,
+                    help="Password for the Hetzner Storage Box user. Only needed for first time setup or '--force-password-use'",
+                    default=False,
+                ),
+            )
+        )
+    ###
+    ### config-file-path
+    ###
+    default = DEFAULT_CONFIG_FILE_PATH
+    default_from_env = get_config_file_path(None)
+    if default_from_env:
+        default = default_from_env
+    specs.append(
+        (
+            ("-c", "--config-file-path"),
+            dict(
+                type=click.STRING,
+                required=False,
+                help="hsbt saves connection infos into a json file. By default root will store connections into '/etc/hetzner_sbt_connections.json' and any other user in '~/.config/hetzner_sbt_connections.json'",
+                default=default,
+            ),
+        )
+    )
+    ###
+    ### ssh-key-dir
+    ###
+    ssh_dir_from_env = get_ssh_dir(None)
+    specs.append(
+        (
+            ("-s", "--ssh-key-dir"),
+            dict(
+                type=click.STRING,
+                prompt="Directory to store ssh private and public key"
+                if with_prompting and ssh_dir_from_env is None
+                else None,
+                help=_SSH_KEY_DIR_HELP_OPTIONAL if optional else _SSH_KEY_DIR_HELP,
+                default="~/.ssh/" if ssh_dir_from_env is None else ssh_dir_from_env,
+                callback=ssh_dir_callback,
+            ),
+        )
+    )
+    ###
+    ### user
+    ###
+    specs.append(
+        (
+            ("-u", "--user"),
+            dict(
+                type=click.STRING,
+                prompt="Username of the Hetzner storage Box" if with_prompting else None,
+                help=_USER_HELP_OPTIONAL if optional else _USER_HELP,
+                **default_param,
+            ),
+        )
+    )
+    ###
+    ### host
+    ###
+    specs.append(
+        (
+            ("-h", "--host"),
+            dict(
+                type=click.STRING,
+                prompt="Host name of the Hetzner storage box" if with_prompting else None,
+                help=_HOST_HELP_OPTIONAL if optional else _HOST_HELP,
+                **default_param,
+            ),
+        )
+    )
+    return tuple(specs)
+
+
 def connection_options(
     with_prompting: bool = False,
     optional: bool = False,
     exlude_params: List[str] = None,
 ):
-    if exlude_params is None:
-        exlude_params = []
+    specs = _connection_option_specs(
+        with_prompting, optional, tuple(exlude_params) if exlude_params else ()
+    )
 
     def connection_options_generator(function):
-        default_param = dict()
-        if optional:
-            default_param["default"] = None
-        else:
-            default_param["required"] = True
-        help_optional_postfix = ". Only required if ('-i'/'--identifier') is empty."
-        ###
-        ### force-password-use
-        ###
-        if "force-password-use" not in exlude_params:
-            function = click.option(
-                "-f",
-                "--force-password-use",
-                type=click.BOOL,
-                is_flag=True,
-                required=False,
-                help="To skip ssh key generation and deployment use the flag '-f'. A password must be provided",
-                default=False,
-            )(function)
-        ###
-        ### password
-        ###
-        if "password" not in exlude_params:
-            function = click.option(
-                "-p",
-                "--password",
-                type=click.STRING,
-                hide_input=True,
-                required=False,
-                help="Password for the Hetzner Storage Box user. Only needed for first time setup or '--force-password-use'",
-                default=False,
-            )(function)
-        ###
-        ### config-file-path
-        ###
-
-        default = (
-            "/etc/hetzner_sbt_connections.json"
-            if is_root()
-            else "~/.config/hetzner_sbt_connections.json"
+        # every command gets its own Option instances, as `conditonal_connection_prompts` mutates them at invocation time
+        if not hasattr(function, "__click_params__"):
+            function.__click_params__ = []
+        function.__click_params__.extend(
+            click.Option(param_decls, **attrs) for param_decls, attrs in specs
         )
-        default_from_env = get_config_file_path(None)
-        if default_from_env:
-            default = default_from_env
-        function = click.option(
-            "-c",
-            "--config-file-path",
-            type=click.STRING,
-            required=False,
-            help="hsbt saves connection infos into a json file. By default root will store connections into '/etc/hetzner_sbt_connections.json' and any other user in '~/.config/hetzner_sbt_connections.json'",
-            default=default,
-        )(function)
-        ###
-        ### ssh-key-dir
-        ###
-        help = "Directory to store the public-, private-key and known_hosts files."
-        if optional:
-            help += help_optional_postfix
-        function = click.option(
-            "-s",
-            "--ssh-key-dir",
-            type=click.STRING,
-            prompt="Directory to store ssh private and public key"
-            if with_prompting and get_ssh_dir(None) is None
-            else None,
-            help=help,
-            default="~/.ssh/" if get_ssh_dir(None) is None else get_ssh_dir(None),
-            callback=ssh_dir_callback,
-        )(function)
-        ###
-        ### user
-        ###
-        help = "The username to connect to the Hetzner storage box. e.g. 'u0000001' or 'u00000001-sub1'"
-        if optional:
-            help += help_optional_postfix
-        function = click.option(
-            "-u",
-            "--user",
-            type=click.STRING,
-            prompt="Username of the Hetzner storage Box" if with_prompting else None,
-            help=help,
-            **default_param,
-        )(function)
-        ###
-        ### host
-        ###
-        help = "The hostname to reach the reach the Hetzner storage box e.g. 'u000001.your-storagebox.de'"
-        if optional:
-            help += help_optional_postfix
-        function = click.option(
-            "-h",
-            "--host",
-            type=click.STRING,
-            prompt="Host name of the Hetzner storage box" if with_prompting else None,
-            help=help,
-            **default_param,
-        )(function)
-
         return function
 
     return connection_options_generator
 
 
+@functools.lru_cache(maxsize=1)
 def get_executable_binary_path_map() -> Dict[str, str]:
-    map = {}
-    for name, envvar in EXECUTABLE_PATH_ENV_VAR_MAPPING.items():
-        map[name] = os.getenv(envvar.value, name)
-    return map
+    # env vars do not change during a cli run. the same dict is shared by all callers, do not mutate it.
+    return {
+        name: os.environ.get(envvar.value, name)
+        for name, envvar in EXECUTABLE_PATH_ENV_VAR_MAPPING.items()
+    }
+
+
+def _get_storage_box_from_identifier(
+    identifier: str, config_file_path: str = None
+) -> "HetznerStorageBox":
+    from hsbt.connection_manager import ConnectionManager
+    from hsbt.storage_box_manager import HetznerStorageBox
+
+    config_file_path: Path = get_config_file_path(config_file_path)
+    conman = ConnectionManager(target_config_file=config_file_path)
+    con = conman.get_connection(identifier=identifier)
+    if con is None:
+        raise click.UsageError(
+            f"Could not find a connection with the identifier '{identifier}'. Use 'hsbt listConnection' to see available connections and/or create a new connection with 'hsbt setConnection'"
+        )
+    return HetznerStorageBox.from_connection(con)
+
+
+def _get_storage_box_from_connection_details(
+    host: str, user: str, ssh_key_dir: str = None
+) -> "HetznerStorageBox":
+    from hsbt.storage_box_manager import HetznerStorageBox
+    from hsbt.key_manager import KeyManager
+
+    ssh_key_dir: Path = get_ssh_dir(ssh_key_dir)
+    return HetznerStorageBox(
+        host=host,
+        user=user,
+        key_manager=KeyManager(target_dir=ssh_key_dir, identifier=host),
+    )
 
 
 def get_and_validate_storage_box_connection(
@@ -215,38 +295,26 @@ def get_and_validate_storage_box_connection(
     config_file_path: str = None,
     force_password_use: bool = False,
     validate_connection: bool = False,
-) -> HetznerStorageBox:
-    config_file_path: Path = get_config_file_path(config_file_path)
-    ssh_key_dir: Path = get_ssh_dir(ssh_key_dir)
-    con = None
-    if password is None:
-        password = cast_path(os.getenv(EnvVarNames.PASSWORD, default=None))
-    hsbt: HetznerStorageBox = None
-    if identifier not in [None, ""]:
-        conman = ConnectionManager(target_config_file=config_file_path)
-        con = conman.get_connection(identifier=identifier)
-        if con is None:
-            raise click.UsageError(
-                f"Could not find a connection with the identifier '{identifier}'. Use 'hsbt listConnection' to see available connections and/or create a new connection with 'hsbt setConnection'"
-            )
-        hsbt = HetznerStorageBox.from_connection(con)
-
-        hsbt.binaries = get_executable_binary_path_map()
+    use_key_deployed_cache: bool = True,
+) -> "HetznerStorageBox":
+    if identifier:
+        hsbt = _get_storage_box_from_identifier(
+            identifier=identifier, config_file_path=config_file_path
+        )
     else:
-        hsbt = HetznerStorageBox(
-            host=host,
-            user=user,
-            key_manager=KeyManager(
-                target_dir=ssh_key_dir, identifier=identifier if identifier else host
-            ),
+        hsbt = _get_storage_box_from_connection_details(
+            host=host, user=user, ssh_key_dir=ssh_key_dir
         )
-        hsbt.binaries = get_executable_binary_path_map()
+    hsbt.binaries = get_executable_binary_path_map()
     if force_password_use or (
-        validate_connection and not hsbt.public_key_is_deployed()
+        validate_connection
+        and not hsbt.public_key_is_deployed(use_cache=use_key_deployed_cache)
     ):
-        if password is None:
+        if not password:
+            password = os.getenv(EnvVarNames.PASSWORD, default=None)
+        if not password:
             password = click.prompt(
-                f"Password for Hetzner Storage Box user {user if con is None else con.user}",
+                f"Password for Hetzner Storage Box user {hsbt.user}",
                 type=click.STRING,
                 hide_input=True,
             )
@@ -261,453 +329,39 @@ def get_and_validate_storage_box_connection(
     return hsbt
 
 
-@click.group()
-@click.option("--debug/--no-debug", default=False)
-def cli(debug):
-    if debug:
-        click.echo(f"Debug mode is on")
-        logging.basicConfig(level="DEBUG")
+# command name -> "module:attribute". Command modules are only imported when the command is invoked (or listed by '--help')
+LAZY_COMMANDS: Dict[str, str] = {
+    "setConnection": "hsbt.commands.set_connection:set_connection",
+    "repairConnection": "hsbt.commands.repair_connection:repair_connection",
+    "deleteConnection": "hsbt.commands.delete_connection:delete_connection",
+    "listConnection": "hsbt.commands.list_connections:list_connections",
+    "remoteCmd": "hsbt.commands.remote_ssh:run_remote_command",
+    "mount": "hsbt.commands.mount:mount",
+    "mountPerm": "hsbt.commands.mount:mount_permanent",
+}
 
 
-@cli.command(
-    name="setConnection",
-    help="Define a new named connection to reference in all other commands",
-)
-@click.option(
-    "-i",
-    "--identifier",
-    type=click.STRING,
-    prompt="Identifying name for the connection",
-    help="An identifier to point to the connection in all other commands.",
-)
-@connection_options(
-    with_prompting=True,
-    optional=False,
-    exlude_params=["force-password-use", "password"],
-)
-@click.option(
-    "-o",
-    "--overwrite-existing",
-    type=click.BOOL,
-    is_flag=True,
-    help="If a connection configuration with the same identifier already exists, this command will fail. If you are sure you want to overwrite it pass '-o' to the command to update the existing connection configuration",
-    default=False,
-)
-@click.option(
-    "-e",
-    "--exists-ok",
-    type=click.BOOL,
-    is_flag=True,
-    help="If a connection configuration with the same identifier already exists just exit without any error",
-    default=False,
-)
-@click.option(
-    "-k",
-    "--skip-key-deployment",
-    type=click.BOOL,
-    is_flag=True,
-    help="If set will not do any external communication. This can be helpful for pre-creating the connection config file. If the key is not deployed, hsbt will ask for the password on first use of the connection to exchange the key then.",
-    default=False,
-)
-def set_connection(
-    identifier: str,
-    host: str,
-    user: str,
-    ssh_key_dir: str | Path,
-    overwrite_existing: bool,
-    exists_ok: bool,
-    config_file_path: str,
-    skip_key_deployment: bool,
-):
-    config_file_path: Path = get_config_file_path(config_file_path)
-    ssh_key_dir: Path = get_ssh_dir(ssh_key_dir)
-    connection_manager = ConnectionManager(target_config_file=config_file_path)
-    con = connection_manager.set_connection(
-        identifier=identifier,
-        user=user,
-        host=host,
-        key_dir=ssh_key_dir,
-        overwrite_existing=overwrite_existing,
-        exists_ok=exists_ok,
-    )
-    if not skip_key_deployment:
-        get_and_validate_storage_box_connection(
-            con.identifier, validate_connection=True, config_file_path=config_file_path
-        )
-    click.echo(f"Saved connection at '{connection_manager.target_config_file}' as:")
-    click.echo(f"\t{con}")
+class LazyGroup(click.Group):
+    def __init__(self, *args, lazy_commands: Dict[str, str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands: Dict[str, str] = lazy_commands or {}
 
-    # ConnectionManager(target_config_file=)
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(super().list_commands(ctx) + list(self.lazy_commands))
 
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_commands:
+            module_name, attr_name = self.lazy_commands[cmd_name].split(":")
+            return getattr(importlib.import_module(module_name), attr_name)
+        return super().get_command(ctx, cmd_name)
 
-@cli.command(
-    name="repairConnection",
-    help="Check if keys and known_hosts_file are existing valid, and deployd. If not try to fix it.",
-)
-@click.option(
-    "-i",
-    "--identifier",
-    type=click.STRING,
-    prompt="Identifying name for the connection",
-    help="An identifier to point to the connection in all other commands.",
-)
-@click.option(
-    "-c",
-    "--config-file-path",
-    type=click.STRING,
-    required=False,
-    help="hsbt saves connection infos into a json file. By default root will store connections into '/etc/hetzner_sbt_connections.json' and any other user in '~/.config/hetzner_sbt_connections.json'",
-    default="/etc/hetzner_sbt_connections.json"
-    if is_root()
-    else "~/.config/hetzner_sbt_connections.json",
-)
-def repair_connection(identifier: str, config_file_path: str):
-    config_file_path: Path = get_config_file_path(config_file_path)
 
-    connection_manager = ConnectionManager(target_config_file=config_file_path)
-    con = connection_manager.get_connection(identifier=identifier)
-    if con is None:
-        raise click.UsageError(
-            f"Could not find a connection with the identifier '{identifier}' to be repaired. Use 'hsbt listConnection' to see available connections and/or create a new connection with 'hsbt setConnection'"
-        )
-    hsbt = get_and_validate_storage_box_connection(
-        identifier=identifier, validate_connection=True
-    )
-    if hsbt.public_key_is_deployed():
-        click.echo("Connection seems to work (again).")
-    else:
-        # todo: provide some more data for debugging
-        raise ConnectionError("Can not repair connection.")
-
-
-@cli.command(
-    name="deleteConnection",
-    help="Define a new named connection to reference in all other commands",
-)
-@click.option(
-    "-i",
-    "--identifier",
-    type=click.STRING,
-    prompt="Identifying name for the connection",
-    help="An identifier to point to the connection in all other commands.",
-)
-@click.option(
-    "-m",
-    "--missing-ok",
-    type=click.BOOL,
-    is_flag=True,
-    help="If a connection configuration with the same identifier already exists, this command will fail. If you are sure you want to overwrite it pass '-o' to the command to update the existing connection configuration",
-    default=False,
-)
-@click.option(
-    "-c",
-    "--config-file-path",
-    type=click.STRING,
-    required=False,
-    help="hsbt saves connection infos into a json file. By default root will store connections into '/etc/hetzner_sbt_connections.json' and any other user in '~/.config/hetzner_sbt_connections.json'",
-    default="/etc/hetzner_sbt_connections.json"
-    if is_root()
-    else "~/.config/hetzner_sbt_connections.json",
-)
-@click.option(
-    "-k",
-    "--delete-keys",
-    type=click.BOOL,
-    is_flag=True,
-    help="Delete ssh keys that are mapped to this connection as well.",
-    default=False,
-)
-def delete_connection(
-    identifier: str,
-    config_file_path: str | Path,
-    delete_keys: bool,
-    missing_ok: bool,
-):
-    config_file_path: Path = get_config_file_path(config_file_path)
-
-    connection_manager = ConnectionManager(target_config_file=config_file_path)
-    con = connection_manager.get_connection(identifier=identifier)
-    if con is not None and delete_keys:
-        hsbt = HetznerStorageBox.from_connection(con)
-        hsbt.key_manager.private_key_path.unlink(missing_ok=True)
-        hsbt.key_manager.public_key_path.unlink(missing_ok=True)
-    connection_manager.delete_connection(identifier=identifier, missing_ok=missing_ok)
-
-
-@cli.command(name="listConnection")
-@click.option(
-    "-f",
-    "--format-output",
-    type=click.Choice(["json", "yaml"], case_sensitive=False),
-    multiple=False,
-    default=None,
-)
-@click.option(
-    "-c",
-    "--config-file-path",
-    type=click.STRING,
-    help="Alternative config file instead of '/etc/hetzner_sbt_connections.json' and '~/.config/hetzner_sbt_connections.json'",
-    default=None,
-)
-def list_connections(format_output, config_file_path):
-    config_file_path: Path = get_config_file_path(config_file_path)
-
-    connection_manager = ConnectionManager(target_config_file=config_file_path)
-
-    if format_output == "yaml":
-        output = yaml.dump(connection_manager.list_connections().dict())
-    else:
-        output = connection_manager.list_connections().json()
-    click.echo(output)
-
-
-@cli.command(
-    name="remoteCmd",
-    help="Run a command at the Hetzner storage box. See https://docs.hetzner.com/robot/storage-box/access/access-sshsync-borg#available-commands for available commands",
-)
-@click.option(
-    "-i",
-    "--identifier",
-    type=click.STRING,
-    help="An identifier of an existing connection defined with 'hsbt setConnection'. Alternatively set '--user' and '--host' to define a connection on the fly (which will not be saved).",
-    default="",
-    callback=conditonal_connection_prompts,
-)
-@connection_options(with_prompting=True, optional=True)
-@click.option(
-    "-n",
-    "--no-exec",
-    type=click.BOOL,
-    is_flag=True,
-    default=False,
-    help="Only return the local ssh command with all parameters to run the remote command",
-)
-@click.argument(
-    "command",
-    type=click.STRING,
-)
-def run_remote_command(
-    identifier: str,
-    host: str,
-    user: str,
-    ssh_key_dir: str | Path,
-    password: str,
-    config_file_path: str,
-    force_password_use: bool,
-    command: str,
-    no_exec: bool,
-) -> str:
-    config_file_path: Path = get_config_file_path(config_file_path)
-    ssh_key_dir: Path = get_ssh_dir(ssh_key_dir)
-    hsbt: HetznerStorageBox = get_and_validate_storage_box_connection(
-        identifier=identifier,
-        host=host,
-        user=user,
-        ssh_key_dir=ssh_key_dir,
-        password=password,
-        config_file_path=config_file_path,
-        force_password_use=force_password_use,
-    )
-    result: CommandResult = hsbt.run_remote_command(
-        command, dry_run=no_exec, return_stdout_only=False
-    )
-    click.echo(result.command if no_exec else result.stdout)
-
-
-@cli.command(
-    name="mount",
-    help="Run a command at the Hetzner storage box. See https://docs.hetzner.com/robot/storage-box/access/access-ssh-rsync-borg#available-commands for available commands",
-)
-@click.option(
-    "-i",
-    "--identifier",
-    type=click.STRING,
-    help="An identifier of an existing connection defined with 'hsbt setConnection'. Alternatively set '--user' and '--host' to define a connection on the fly (which will not be saved).",
-    default="",
-    callback=conditonal_connection_prompts,
-)
-@connection_options(with_prompting=True, optional=True)
-@click.option(
-    "-r",
-    "--rclone-config-file",
-    type=click.STRING,
-    default=None,
-)
-@click.option(
-    "-mp",
-    "--mount-point",
-    type=click.STRING,
-)
-@click.option(
-    "-mt",
-    "--mount-tool",
-    type=click.Choice(["sshfs", "rclone"], case_sensitive=False),
-    multiple=False,
-    default="rclone",
-)
-def mount(
-    identifier: str,
-    host: str,
-    user: str,
-    ssh_key_dir: str | Path,
-    password: str,
-    config_file_path: str,
-    force_password_use: str,
-    rclone_config_file: str,
-    mount_point: str,
-    mount_tool: Literal["sshfs", "rclone"],
-):
-    hsbt: HetznerStorageBox = get_and_validate_storage_box_connection(
-        identifier=identifier,
-        host=host,
-        user=user,
-        ssh_key_dir=ssh_key_dir,
-        password=password,
-        config_file_path=config_file_path,
-        force_password_use=force_password_use,
-    )
-    if mount_tool == "sshfs":
-        log.warning(
-            "sshfs is unmaintained at the moment. see https://github.com/libfuse/sshfs for more details. \
-            It is recommended to use rclone (https://rclone.org/commands/rclone_mount/) as mounting tool. \
-            Just use the '-t rclone' / '--mount-tool=rclone' parameter."
-        )
-        hsbt.mount_storage_box_via_sshfs(local_mountpoint=mount_point)
-    elif mount_tool == "rclone":
-        rclone = Rclone(
-            storage_box_manager=hsbt,
-            config_file_path=get_rclone_config_file_path(rclone_config_file),
-        )
-        rclone.binaries = get_executable_binary_path_map()
-        rclone.generate_config_file_if_not_exists()
-        rclone.mount(mount_point)
-
-
-@cli.command(
-    name="mountPerm",
-    help="Run a command at the Hetzner storage box. See https://docs.hetzner.com/robot/storage-box/access/access-sshsync-borg#available-commands for available commands",
-)
-@click.option(
-    "-i",
-    "--identifier",
-    type=click.STRING,
-    help="An identifier of an existing connection defined with 'hsbt setConnection'. Alternatively set '--user' and '--host' to define a connection on the fly (which will not be saved).",
-    default="",
-    callback=conditonal_connection_prompts,
-)
-@connection_options(with_prompting=True, optional=True)
-@click.option(
-    "-r",
-    "--remote-path",
-    help="Remote path to mount localy. Use a relative path, if you are not sure how to access the Hetzner Storage Box home dir.",
-    type=click.STRING,
-    default=".",
-)
-@click.option(
-    "-m",
-    "--mount-point",
-    type=click.STRING,
-)
-@click.option(
-    "-ms",
-    "--mount-style",
-    type=click.Choice(["fstab", "systemd-automount", "autofs"], case_sensitive=False),
-    help="Define the mount as fstab entry, as systemd-automount unit or with autofs.",
-    multiple=False,
-    default="fstab",
-)
-@click.option(
-    "-mt",
-    "--mount-tool",
-    type=click.Choice(["sshfs", "rclone"], case_sensitive=False),
-    help="Mount via fuse sshfs or fuse rcone. rclone will become the default in a future version, as sshfs is not maintained at the moment.",
-    multiple=False,
-    default="sshfs",
-)
-@click.option(
-    "-ff",
-    "--fstab-file",
-    type=click.STRING,
-    help="Is it possible to use an alternative fstab file e.g. 'mount --fstab /tmp/mycustom_fstab [...]'. Define it here. Also handy for testing.",
-    default="/etc/fstab",
-)
-@click.option(
-    "-ui",
-    "--uid",
-    type=click.STRING,
-    help="Define the 'uid=' parameter for the festab entry. Default to current user",
-    default=None,
-)
-@click.option(
-    "-gi",
-    "--gid",
-    type=click.STRING,
-    help="Define the 'gid=' parameter for the festab entry. Default to current users primary group",
-    default=None,
-)
-@click.option(
-    "-rc",
-    "--rclone-config-file",
-    type=click.STRING,
-    help="If you use an alternative path for the rcloen config, define here",
-    default=None,
-)
-def mount_permanent(
-    identifier: str,
-    host: str,
-    user: str,
-    ssh_key_dir: str | Path,
-    password: str,
-    config_file_path: str,
-    force_password_use: str,
-    remote_path: str | Path,
-    mount_point: str,
-    mount_tool: Literal["sshfs", "rclone"],
-    mount_style: Literal["fstab", "systemd-automount", "autofs"],
-    fstab_file: str | Path,
-    uid: str = None,
-    gid: str = None,
-    rclone_config_file: str | Path = None,
-):
-    if mount_style in ["systemd-automount", "autofs"]:
-        raise NotImplementedError(
-            'mount-style "systemd-automount" and "autofs" is not implemented yet.'
-        )
-    hsbt: HetznerStorageBox = get_and_validate_storage_box_connection(
-        identifier=identifier,
-        host=host,
-        user=user,
-        ssh_key_dir=ssh_key_dir,
-        password=password,
-        config_file_path=config_file_path,
-        force_password_use=force_password_use,
-    )
-    if mount_tool == "sshfs":
-        hsbt.mount_storage_box_via_fstab_via_sshfs(
-            local_mountpoint=mount_point,
-            fstab_file=fstab_file,
-            user_id=uid,
-            group_id=gid,
-        )
-        click.echo(
-            f"Mounted storage box '{hsbt.host}' at '{mount_point}'. Config can be found at '{fstab_file}'"
-        )
-    elif mount_tool == "rclone":
-        raise NotImplementedError(
-            'mount_tool via fuse "rclone" is not implemented yet.'
-        )
-
-
-def available_space(connection_identifier: str):
-    pass
-
-
-def download_from_remote(connection_identifier: str):
-    pass
-
-
-def upload_to_remote(connection_identifier: str):
-    pass
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
+@click.option("--debug/--no-debug", default=False)
+def cli(debug):
+    if debug:
+        click.echo(f"Debug mode is on")
+        logging.basicConfig(level="DEBUG")
 
 
 if __name__ == "__main__":
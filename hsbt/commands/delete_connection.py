@@ -0,0 +1,62 @@
+from pathlib import Path
+import click
+
+from hsbt.cli import (
+    get_config_file_path,
+    DEFAULT_CONFIG_FILE_PATH,
+)
+
+
+@click.command(
+    name="deleteConnection",
+    help="Define a new named connection to reference in all other commands",
+)
+@click.option(
+    "-i",
+    "--identifier",
+    type=click.STRING,
+    prompt="Identifying name for the connection",
+    help="An identifier to point to the connection in all other commands.",
+)
+@click.option(
+    "-m",
+    "--missing-ok",
+    type=click.BOOL,
+    is_flag=True,
+    help="If a connection configuration with the same identifier already exists, this command will fail. If you are sure you want to overwrite it pass '-o' to the command to update the existing connection configuration",
+    default=False,
+)
+@click.option(
+    "-c",
+    "--config-file-path",
+    type=click.STRING,
+    required=False,
+    help="hsbt saves connection infos into a json file. By default root will store connections into '/etc/hetzner_sbt_connections.json' and any other user in '~/.config/hetzner_sbt_connections.json'",
+    default=DEFAULT_CONFIG_FILE_PATH,
+)
+@click.option(
+    "-k",
+    "--delete-keys",
+    type=click.BOOL,
+    is_flag=True,
+    help="Delete ssh keys that are mapped to this connection as well.",
+    default=False,
+)
+def delete_connection(
+    identifier: str,
+    config_file_path: str | Path,
+    delete_keys: bool,
+    missing_ok: bool,
+):
+    from hsbt.connection_manager import ConnectionManager
+    from hsbt.storage_box_manager import HetznerStorageBox
+
+    config_file_path: Path = get_config_file_path(config_file_path)
+
+    connection_manager = ConnectionManager(target_config_file=config_file_path)
+    con = connection_manager.get_connection(identifier=identifier)
+    if con is not None and delete_keys:
+        hsbt = HetznerStorageBox.from_connection(con)
+        hsbt.key_manager.private_key_path.unlink(missing_ok=True)
+        hsbt.key_manager.public_key_path.unlink(missing_ok=True)
+    connection_manager.delete_connection(identifier=identifier, missing_ok=missing_ok)
@@ -0,0 +1,63 @@
+from typing import TYPE_CHECKING, Dict, Callable
+from pathlib import Path
+import click
+
+from hsbt.cli import get_config_file_path
+
+if TYPE_CHECKING:
+    from hsbt.connection_manager import ConnectionManager
+
+
+def _dump_connections_yaml(connections: "ConnectionManager.ConnectionList") -> str:
+    import yaml
+
+    try:
+        from yaml import CSafeDumper as YamlDumper
+    except ImportError:
+        from yaml import SafeDumper as YamlDumper
+
+    return yaml.dump(
+        connections.to_dict(),
+        Dumper=YamlDumper,
+        default_flow_style=False,
+    )
+
+
+def _dump_connections_json(connections: "ConnectionManager.ConnectionList") -> str:
+    return connections.to_json()
+
+
+CONNECTION_LIST_FORMATTERS: Dict[str | None, Callable[..., str]] = {
+    "yaml": _dump_connections_yaml,
+    "json": _dump_connections_json,
+    None: _dump_connections_json,
+}
+_FORMAT_OUTPUT_CHOICE = click.Choice(["json", "yaml"], case_sensitive=False)
+
+
+@click.command(name="listConnection")
+@click.option(
+    "-f",
+    "--format-output",
+    type=_FORMAT_OUTPUT_CHOICE,
+    multiple=False,
+    default=None,
+)
+@click.option(
+    "-c",
+    "--config-file-path",
+    type=click.STRING,
+    help="Alternative config file instead of '/etc/hetzner_sbt_connections.json' and '~/.config/hetzner_sbt_connections.json'",
+    default=None,
+)
+def list_connections(format_output, config_file_path):
+    from hsbt.connection_manager import ConnectionManager
+
+    config_file_path: Path = get_config_file_path(config_file_path)
+
+    connection_manager = ConnectionManager(target_config_file=config_file_path)
+
+    output = CONNECTION_LIST_FORMATTERS[format_output](
+        connection_manager.list_connections()
+    )
+    click.echo(output)
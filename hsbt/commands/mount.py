@@ -0,0 +1,207 @@
+from typing import TYPE_CHECKING, Literal
+from pathlib import Path
+import click
+import logging
+
+from hsbt.cli import (
+    get_rclone_config_file_path,
+    conditonal_connection_prompts,
+    connection_options,
+    get_and_validate_storage_box_connection,
+)
+
+if TYPE_CHECKING:
+    from hsbt.storage_box_manager import HetznerStorageBox
+
+
+log = logging.getLogger(__name__)
+
+_MOUNT_TOOL_CHOICE = click.Choice(["sshfs", "rclone"], case_sensitive=False)
+_MOUNT_STYLE_CHOICE = click.Choice(
+    ["fstab", "systemd-automount", "autofs"], case_sensitive=False
+)
+
+
+@click.command(
+    name="mount",
+    help="Run a command at the Hetzner storage box. See https://docs.hetzner.com/robot/storage-box/access/access-ssh-rsync-borg#available-commands for available commands",
+)
+@click.option(
+    "-i",
+    "--identifier",
+    type=click.STRING,
+    help="An identifier of an existing connection defined with 'hsbt setConnection'. Alternatively set '--user' and '--host' to define a connection on the fly (which will not be saved).",
+    default="",
+    callback=conditonal_connection_prompts,
+)
+@connection_options(with_prompting=True, optional=True)
+@click.option(
+    "-r",
+    "--rclone-config-file",
+    type=click.STRING,
+    default=None,
+)
+@click.option(
+    "-mp",
+    "--mount-point",
+    type=click.STRING,
+)
+@click.option(
+    "-mt",
+    "--mount-tool",
+    type=_MOUNT_TOOL_CHOICE,
+    multiple=False,
+    default="rclone",
+)
+def mount(
+    identifier: str,
+    host: str,
+    user: str,
+    ssh_key_dir: str | Path,
+    password: str,
+    config_file_path: str,
+    force_password_use: str,
+    rclone_config_file: str,
+    mount_point: str,
+    mount_tool: Literal["sshfs", "rclone"],
+):
+    hsbt: HetznerStorageBox = get_and_validate_storage_box_connection(
+        identifier=identifier,
+        host=host,
+        user=user,
+        ssh_key_dir=ssh_key_dir,
+        password=password,
+        config_file_path=config_file_path,
+        force_password_use=force_password_use,
+    )
+    if mount_tool == "sshfs":
+        log.warning(
+            "sshfs is unmaintained at the moment. see https://github.com/libfuse/sshfs for more details. \
+            It is recommended to use rclone (https://rclone.org/commands/rclone_mount/) as mounting tool. \
+            Just use the '-t rclone' / '--mount-tool=rclone' parameter."
+        )
+        hsbt.mount_storage_box_via_sshfs(local_mountpoint=mount_point)
+    elif mount_tool == "rclone":
+        from hsbt.rclone_manager import Rclone
+
+        rclone = Rclone(
+            storage_box_manager=hsbt,
+            config_file_path=get_rclone_config_file_path(rclone_config_file),
+        )
+        rclone.generate_config_file_if_not_exists()
+        rclone.mount(mount_point)
+
+
+@click.command(
+    name="mountPerm",
+    help="Run a command at the Hetzner storage box. See https://docs.hetzner.com/robot/storage-box/access/access-sshsync-borg#available-commands for available commands",
+)
+@click.option(
+    "-i",
+    "--identifier",
+    type=click.STRING,
+    help="An identifier of an existing connection defined with 'hsbt setConnection'. Alternatively set '--user' and '--host' to define a connection on the fly (which will not be saved).",
+    default="",
+    callback=conditonal_connection_prompts,
+)
+@connection_options(with_prompting=True, optional=True)
+@click.option(
+    "-r",
+    "--remote-path",
+    help="Remote path to mount localy. Use a relative path, if you are not sure how to access the Hetzner Storage Box home dir.",
+    type=click.STRING,
+    default=".",
+)
+@click.option(
+    "-m",
+    "--mount-point",
+    type=click.STRING,
+)
+@click.option(
+    "-ms",
+    "--mount-style",
+    type=_MOUNT_STYLE_CHOICE,
+    help="Define the mount as fstab entry, as systemd-automount unit or with autofs.",
+    multiple=False,
+    default="fstab",
+)
+@click.option(
+    "-mt",
+    "--mount-tool",
+    type=_MOUNT_TOOL_CHOICE,
+    help="Mount via fuse sshfs or fuse rcone. rclone will become the default in a future version, as sshfs is not maintained at the moment.",
+    multiple=False,
+    default="sshfs",
+)
+@click.option(
+    "-ff",
+    "--fstab-file",
+    type=click.STRING,
+    help="Is it possible to use an alternative fstab file e.g. 'mount --fstab /tmp/mycustom_fstab [...]'. Define it here. Also handy for testing.",
+    default="/etc/fstab",
+)
+@click.option(
+    "-ui",
+    "--uid",
+    type=click.STRING,
+    help="Define the 'uid=' parameter for the festab entry. Default to current user",
+    default=None,
+)
+@click.option(
+    "-gi",
+    "--gid",
+    type=click.STRING,
+    help="Define the 'gid=' parameter for the festab entry. Default to current users primary group",
+    default=None,
+)
+@click.option(
+    "-rc",
+    "--rclone-config-file",
+    type=click.STRING,
+    help="If you use an alternative path for the rcloen config, define here",
+    default=None,
+)
+def mount_permanent(
+    identifier: str,
+    host: str,
+    user: str,
+    ssh_key_dir: str | Path,
+    password: str,
+    config_file_path: str,
+    force_password_use: str,
+    remote_path: str | Path,
+    mount_point: str,
+    mount_tool: Literal["sshfs", "rclone"],
+    mount_style: Literal["fstab", "systemd-automount", "autofs"],
+    fstab_file: str | Path,
+    uid: str = None,
+    gid: str = None,
+    rclone_config_file: str | Path = None,
+):
+    if mount_style in ("systemd-automount", "autofs"):
+        raise NotImplementedError(
+            'mount-style "systemd-automount" and "autofs" is not implemented yet.'
+        )
+    hsbt: HetznerStorageBox = get_and_validate_storage_box_connection(
+        identifier=identifier,
+        host=host,
+        user=user,
+        ssh_key_dir=ssh_key_dir,
+        password=password,
+        config_file_path=config_file_path,
+        force_password_use=force_password_use,
+    )
+    if mount_tool == "sshfs":
+        hsbt.mount_storage_box_via_fstab_via_sshfs(
+            local_mountpoint=mount_point,
+            fstab_file=fstab_file,
+            user_id=uid,
+            group_id=gid,
+        )
+        click.echo(
+            f"Mounted storage box '{hsbt.host}' at '{mount_point}'. Config can be found at '{fstab_file}'"
+        )
+    elif mount_tool == "rclone":
+        raise NotImplementedError(
+            'mount_tool via fuse "rclone" is not implemented yet.'
+        )
@@ -0,0 +1,67 @@
+from typing import TYPE_CHECKING
+from pathlib import Path
+import click
+
+from hsbt.cli import (
+    get_config_file_path,
+    get_ssh_dir,
+    conditonal_connection_prompts,
+    connection_options,
+    get_and_validate_storage_box_connection,
+)
+
+if TYPE_CHECKING:
+    from hsbt.storage_box_manager import HetznerStorageBox, CommandResult
+
+
+@click.command(
+    name="remoteCmd",
+    help="Run a command at the Hetzner storage box. See https://docs.hetzner.com/robot/storage-box/access/access-sshsync-borg#available-commands for available commands",
+)
+@click.option(
+    "-i",
+    "--identifier",
+    type=click.STRING,
+    help="An identifier of an existing connection defined with 'hsbt setConnection'. Alternatively set '--user' and '--host' to define a connection on the fly (which will not be saved).",
+    default="",
+    callback=conditonal_connection_prompts,
+)
+@connection_options(with_prompting=True, optional=True)
+@click.option(
+    "-n",
+    "--no-exec",
+    type=click.BOOL,
+    is_flag=True,
+    default=False,
+    help="Only return the local ssh command with all parameters to run the remote command",
+)
+@click.argument(
+    "command",
+    type=click.STRING,
+)
+def run_remote_command(
+    identifier: str,
+    host: str,
+    user: str,
+    ssh_key_dir: str | Path,
+    password: str,
+    config_file_path: str,
+    force_password_use: bool,
+    command: str,
+    no_exec: bool,
+) -> str:
+    config_file_path: Path = get_config_file_path(config_file_path)
+    ssh_key_dir: Path = get_ssh_dir(ssh_key_dir)
+    hsbt: HetznerStorageBox = get_and_validate_storage_box_connection(
+        identifier=identifier,
+        host=host,
+        user=user,
+        ssh_key_dir=ssh_key_dir,
+        password=password,
+        config_file_path=config_file_path,
+        force_password_use=force_password_use,
+    )
+    result: CommandResult = hsbt.run_remote_command(
+        command, dry_run=no_exec, return_stdout_only=False
+    )
+    click.echo(result.command if no_exec else result.stdout)
@@ -0,0 +1,48 @@
+from pathlib import Path
+import click
+
+from hsbt.cli import (
+    get_config_file_path,
+    get_and_validate_storage_box_connection,
+    DEFAULT_CONFIG_FILE_PATH,
+)
+
+
+@click.command(
+    name="repairConnection",
+    help="Check if keys and known_hosts_file are existing valid, and deployd. If not try to fix it.",
+)
+@click.option(
+    "-i",
+    "--identifier",
+    type=click.STRING,
+    prompt="Identifying name for the connection",
+    help="An identifier to point to the connection in all other commands.",
+)
+@click.option(
+    "-c",
+    "--config-file-path",
+    type=click.STRING,
+    required=False,
+    help="hsbt saves connection infos into a json file. By default root will store connections into '/etc/hetzner_sbt_connections.json' and any other user in '~/.config/hetzner_sbt_connections.json'",
+    default=DEFAULT_CONFIG_FILE_PATH,
+)
+def repair_connection(identifier: str, config_file_path: str):
+    from hsbt.connection_manager import ConnectionManager
+
+    config_file_path: Path = get_config_file_path(config_file_path)
+
+    connection_manager = ConnectionManager(target_config_file=config_file_path)
+    con = connection_manager.get_connection(identifier=identifier)
+    if con is None:
+        raise click.UsageError(
+            f"Could not find a connection with the identifier '{identifier}' to be repaired. Use 'hsbt listConnection' to see available connections and/or create a new connection with 'hsbt setConnection'"
+        )
+    hsbt = get_and_validate_storage_box_connection(
+        identifier=identifier, validate_connection=True, use_key_deployed_cache=False
+    )
+    if hsbt.public_key_is_deployed(use_cache=False):
+        click.echo("Connection seems to work (again).")
+    else:
+        # todo: provide some more data for debugging
+        raise ConnectionError("Can not repair connection.")
@@ -0,0 +1,82 @@
+from pathlib import Path
+import click
+
+from hsbt.cli import (
+    get_config_file_path,
+    get_ssh_dir,
+    connection_options,
+    get_and_validate_storage_box_connection,
+)
+
+
+@click.command(
+    name="setConnection",
+    help="Define a new named connection to reference in all other commands",
+)
+@click.option(
+    "-i",
+    "--identifier",
+    type=click.STRING,
+    prompt="Identifying name for the connection",
+    help="An identifier to point to the connection in all other commands.",
+)
+@connection_options(
+    with_prompting=True,
+    optional=False,
+    exlude_params=["force-password-use", "password"],
+)
+@click.option(
+    "-o",
+    "--overwrite-existing",
+    type=click.BOOL,
+    is_flag=True,
+    help="If a connection configuration with the same identifier already exists, this command will fail. If you are sure you want to overwrite it pass '-o' to the command to update the existing connection configuration",
+    default=False,
+)
+@click.option(
+    "-e",
+    "--exists-ok",
+    type=click.BOOL,
+    is_flag=True,
+    help="If a connection configuration with the same identifier already exists just exit without any error",
+    default=False,
+)
+@click.option(
+    "-k",
+    "--skip-key-deployment",
+    type=click.BOOL,
+    is_flag=True,
+    help="If set will not do any external communication. This can be helpful for pre-creating the connection config file. If the key is not deployed, hsbt will ask for the password on first use of the connection to exchange the key then.",
+    default=False,
+)
+def set_connection(
+    identifier: str,
+    host: str,
+    user: str,
+    ssh_key_dir: str | Path,
+    overwrite_existing: bool,
+    exists_ok: bool,
+    config_file_path: str,
+    skip_key_deployment: bool,
+):
+    from hsbt.connection_manager import ConnectionManager
+
+    config_file_path: Path = get_config_file_path(config_file_path)
+    ssh_key_dir: Path = get_ssh_dir(ssh_key_dir)
+    connection_manager = ConnectionManager(target_config_file=config_file_path)
+    con = connection_manager.set_connection(
+        identifier=identifier,
+        user=user,
+        host=host,
+        key_dir=ssh_key_dir,
+        overwrite_existing=overwrite_existing,
+        exists_ok=exists_ok,
+    )
+    if not skip_key_deployment:
+        get_and_validate_storage_box_connection(
+            con.identifier, validate_connection=True, config_file_path=config_file_path
+        )
+    click.echo(f"Saved connection at '{connection_manager.target_config_file}' as:")
+    click.echo(f"\t{con}")
+
+    # ConnectionManager(target_config_file=)
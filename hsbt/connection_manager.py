@@ -1,31 +1,92 @@
 import os, sys
-from typing import Union, List, Dict, Any
-from pathlib import Path, PurePath
-from hsbt.utils import is_root, cast_path
-import json
-from pydantic import BaseModel, Field
+from typing import Union, List, Dict, Any, Tuple
+from pathlib import Path
+from hsbt.utils import (
+    is_root,
+    cast_path,
+    json_dumps,
+    json_dumps_bytes,
+    json_loads,
+    write_file_atomic,
+)
+from dataclasses import dataclass, asdict, fields
 
 import logging
 
 log = logging.getLogger(__name__)
 
+_USER_CONFIG_PATH = Path.home() / ".config" / "hetzner_sbt_connections.json"
+_ROOT_CONFIG_PATH = Path("/etc/hetzner_sbt_connections.json")
+_IS_ROOT = is_root()
+
+# parsed config files of this process. path -> (st_mtime_ns, st_size, ConnectionList)
+_PARSE_CACHE: Dict[Path, Tuple[int, int, "ConnectionManager.ConnectionList"]] = {}
+
+# errors that mark a config source as "not available" while looking up connections
+_UNREADABLE_SOURCE_ERRORS = (FileNotFoundError, PermissionError, IsADirectoryError)
+
 
 class ConnectionManager:
-    class Connection(BaseModel):
+    @dataclass(frozen=True, slots=True)
+    class Connection:
         identifier: str
         host: str
         user: str
         key_dir: str
 
-    class ConnectionList(BaseModel):
-        connections: Dict[str, "ConnectionManager.Connection"] = Field(
-            default_factory=dict
-        )
+        def __post_init__(self):
+            # identifiers, hosts and users are short strings repeated across config sources
+            for name in ("identifier", "host", "user"):
+                value = getattr(self, name)
+                if isinstance(value, str):
+                    object.__setattr__(self, name, sys.intern(value))
+
+        def __str__(self):
+            return " ".join(f"{f.name}={getattr(self, f.name)!r}" for f in fields(self))
+
+        @classmethod
+        def from_dict(cls, data: Dict) -> "ConnectionManager.Connection":
+            # unknown keys (e.g. written by another hsbt version) are ignored, like the former pydantic model did
+            return cls(**{k: v for k, v in data.items() if k in _CONNECTION_FIELDS})
+
+    class ConnectionList:
+        __slots__ = ("connections",)
+
+        def __init__(
+            self, connections: Dict[str, "ConnectionManager.Connection"] = None
+        ):
+            self.connections: Dict[str, ConnectionManager.Connection] = (
+                connections if connections is not None else {}
+            )
+
+        @classmethod
+        def from_dict(cls, data: Dict) -> "ConnectionManager.ConnectionList":
+            return cls(
+                {
+                    identifier: ConnectionManager.Connection.from_dict(con)
+                    for identifier, con in data.get("connections", {}).items()
+                }
+            )
+
+        @classmethod
+        def from_json(cls, data: str | bytes) -> "ConnectionManager.ConnectionList":
+            return cls.from_dict(json_loads(data))
+
+        def to_dict(self) -> Dict:
+            return {
+                "connections": {
+                    identifier: asdict(con)
+                    for identifier, con in self.connections.items()
+                }
+            }
+
+        def to_json(self) -> str:
+            return json_dumps(self.to_dict())
 
         def extend_connections(
             self, other_connection_list: "ConnectionManager.ConnectionList"
         ):
-            self.connections = self.connections | other_connection_list.connections
+            self.connections.update(other_connection_list.connections)
 
         def set_connection(
             self,
@@ -57,47 +118,84 @@ class ConnectionManager:
 
             elif isinstance(connection, str):
                 conid = connection
-            self.connections = {
-                key: con for key, con in self.connections.items() if key != conid
-            }
+            return self.connections.pop(conid, None)
 
     def __init__(self, target_config_file: Union[str, Path] = None):
-        user_config_path = Path(
-            PurePath(Path.home(), ".config/hetzner_sbt_connections.json")
-        )
-        root_config_path = Path("/etc/hetzner_sbt_connections.json")
         if target_config_file is None:
-            if is_root():
-                target_config_file = root_config_path
-                alternative_config_file_sources = [user_config_path]
+            if _IS_ROOT:
+                target_config_file = _ROOT_CONFIG_PATH
+                alternative_config_file_sources = [_USER_CONFIG_PATH]
             else:
-                target_config_file = user_config_path
-                alternative_config_file_sources = [root_config_path]
+                target_config_file = _USER_CONFIG_PATH
+                alternative_config_file_sources = [_ROOT_CONFIG_PATH]
         else:
             target_config_file = cast_path(target_config_file)
-            alternative_config_file_sources = [root_config_path, user_config_path]
+            alternative_config_file_sources = [_ROOT_CONFIG_PATH, _USER_CONFIG_PATH]
         self.target_config_file: Path = target_config_file
         self.alternative_config_file_sources = alternative_config_file_sources
+        # an explicit target file can also be one of the default locations, search each file once
+        self._search_sources: Tuple[Path, ...] = tuple(
+            dict.fromkeys((target_config_file, *alternative_config_file_sources))
+        )
+
+    @staticmethod
+    def _get_cached_connection_list(
+        source_file: Path, stat: os.stat_result
+    ) -> ConnectionList | None:
+        cached = _PARSE_CACHE.get(source_file)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        return None
+
+    @staticmethod
+    def _read_connection_list(source_file: Path) -> ConnectionList:
+        stat = os.stat(source_file)
+        if stat.st_size == 0:
+            return ConnectionManager.ConnectionList()
+        conlist = ConnectionManager._get_cached_connection_list(source_file, stat)
+        if conlist is None:
+            conlist = ConnectionManager.ConnectionList.from_json(
+                source_file.read_bytes()
+            )
+            _PARSE_CACHE[source_file] = (stat.st_mtime_ns, stat.st_size, conlist)
+        # hand out a copy with its own dict, callers are allowed to add/remove connections
+        return ConnectionManager.ConnectionList(dict(conlist.connections))
+
+    @staticmethod
+    def _read_connection(source_file: Path, identifier: str) -> Connection | None:
+        stat = os.stat(source_file)
+        if stat.st_size == 0:
+            return None
+        conlist = ConnectionManager._get_cached_connection_list(source_file, stat)
+        if conlist is not None:
+            return conlist.get_connection(identifier=identifier)
+        # cold path: only validate the one connection we are looking for
+        entry = (
+            json_loads(source_file.read_bytes()).get("connections", {}).get(identifier)
+        )
+        return None if entry is None else ConnectionManager.Connection.from_dict(entry)
+
+    @staticmethod
+    def _write_connection_list(target_file: Path, connection_list: ConnectionList):
+        _PARSE_CACHE.pop(target_file, None)
+        write_file_atomic(
+            target_file, json_dumps_bytes(connection_list.to_dict(), indent=True)
+        )
 
     def list_connections(
         self,
         from_specific_config_file: Union[str, Path] = None,
     ) -> ConnectionList:
         if from_specific_config_file is not None:
-            sources = [from_specific_config_file]
+            sources = (from_specific_config_file,)
         else:
-            sources = [self.target_config_file] + self.alternative_config_file_sources
+            sources = self._search_sources
         cons = ConnectionManager.ConnectionList()
         for source_file in sources:
-            if (
-                source_file.is_file()
-                and os.access(source_file, os.R_OK)
-                and os.stat(source_file).st_size != 0
-            ):
-                ConnectionManager.ConnectionList.update_forward_refs()
-                cons.extend_connections(
-                    ConnectionManager.ConnectionList.parse_file(source_file)
-                )
+            try:
+                cons.extend_connections(self._read_connection_list(source_file))
+            except _UNREADABLE_SOURCE_ERRORS:
+                continue
         return cons
 
     def set_connection(
@@ -113,12 +211,15 @@ class ConnectionManager:
         con = ConnectionManager.Connection(
             identifier=identifier, host=host, user=user, key_dir=str(key_dir)
         )
+        previous_con = existing_cons.get_connection(identifier)
         existing_cons.set_connection(
             con, ovewrite_existing=overwrite_existing, exist_ok=exists_ok
         )
+        if existing_cons.get_connection(identifier) == previous_con:
+            # nothing changed, leave the config file untouched
+            return con
         self.target_config_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.target_config_file, "w") as file:
-            file.write(existing_cons.json())
+        self._write_connection_list(self.target_config_file, existing_cons)
         return con
 
     def get_connection(
@@ -128,17 +229,16 @@ class ConnectionManager:
         from_specific_config_file: Union[str, Path] = None,
     ) -> Connection:
         if from_specific_config_file is not None:
-            sources = [from_specific_config_file]
+            sources = (from_specific_config_file,)
         else:
-            sources = [self.target_config_file] + self.alternative_config_file_sources
+            sources = self._search_sources
         for source_file in sources:
-            if source_file.is_file() and os.access(source_file, os.R_OK):
-                ConnectionManager.ConnectionList.update_forward_refs()
-                con = ConnectionManager.ConnectionList.parse_file(
-                    source_file
-                ).get_connection(identifier=identifier)
-                if con is not None:
-                    return con
+            try:
+                con = self._read_connection(source_file, identifier=identifier)
+            except _UNREADABLE_SOURCE_ERRORS:
+                continue
+            if con is not None:
+                return con
         return default
 
     def delete_connection(
@@ -148,27 +248,34 @@ class ConnectionManager:
         missing_ok: bool = False,
     ) -> Connection:
         if from_specific_config_file is not None:
-            sources = [from_specific_config_file]
+            sources = (from_specific_config_file,)
         else:
-            sources = [self.target_config_file] + self.alternative_config_file_sources
+            sources = self._search_sources
         for source_file in sources:
-            if source_file.is_file() and os.access(source_file, os.R_OK):
-                conlist = ConnectionManager.ConnectionList.parse_file(source_file)
-                if conlist.get_connection(identifier=identifier) is not None:
-                    if not os.access(source_file, os.W_OK):
-                        raise PermissionError(
-                            f"Found connection '{identifier}' in '{source_file}'. But file is not writable. Please try again with correct/sudo permissions."
-                        )
-                    conlist.remove_connection(identifier)
-                    with open(self.target_config_file, "w") as file:
-                        file.write(conlist.json())
-                    log.debug(
-                        f"Removed connection with identifier '{identifier}' from file '{source_file}'"
+            try:
+                conlist = self._read_connection_list(source_file)
+            except _UNREADABLE_SOURCE_ERRORS:
+                continue
+            if conlist.get_connection(identifier=identifier) is not None:
+                # the file is replaced by a new one, that needs write access to its directory as well
+                if not os.access(source_file, os.W_OK) or not os.access(
+                    Path(source_file).resolve().parent, os.W_OK | os.X_OK
+                ):
+                    raise PermissionError(
+                        f"Found connection '{identifier}' in '{source_file}'. But file or its directory is not writable. Please try again with correct/sudo permissions."
                     )
-                    return True
+                conlist.remove_connection(identifier)
+                self._write_connection_list(source_file, conlist)
+                log.debug(
+                    f"Removed connection with identifier '{identifier}' from file '{source_file}'"
+                )
+                return True
         not_found_message = f"Could not find connection with identifier '{identifier}'. Config files checked: {sources}"
         if not missing_ok:
             raise ValueError(not_found_message)
         else:
             log.debug(not_found_message)
             return False
+
+
+_CONNECTION_FIELDS = frozenset(f.name for f in fields(ConnectionManager.Connection))
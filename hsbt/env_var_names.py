@@ -9,11 +9,9 @@ class EnvVarNames(str, Enum):
     RCLONE_CONFIG_FILE = "HSBT_RCLONE_CONFIG_FILE"
     PASSWORD = "HSBT_PASSWORD"
     BIN_PATH_RCLONE = "HSBT_BIN_PATH_RCLONE"
-    BIN_PATH_SSH = "HSBT_BIN_PATH_RCLONE"
+    BIN_PATH_SSH = "HSBT_BIN_PATH_SSH"
     BIN_PATH_SSHFS = "HSBT_BIN_PATH_SSHFS"
-    BIN_PATH_SCP = "HSBT_BIN_PATH_SCP"
-    BIN_PATH_SSH_COPY_ID = "HSBT_BIN_PATH_SSH_COPY_ID"
-    BIN_PATH_SSHPASS = "HSBT_BIN_PATH_SSHPASS"
+    BIN_PATH_SFTP = "HSBT_BIN_PATH_SFTP"
     BIN_PATH_MOUNT = "HSBT_BIN_PATH_MOUNT"
     BIN_PATH_UMOUNT = "HSBT_BIN_PATH_UMOUNT"
 
@@ -22,9 +20,7 @@ EXECUTABLE_PATH_ENV_VAR_MAPPING: Dict[str, EnvVarNames] = {
     "rclone": EnvVarNames.BIN_PATH_RCLONE,
     "ssh": EnvVarNames.BIN_PATH_SSH,
     "sshfs": EnvVarNames.BIN_PATH_SSHFS,
-    "scp": EnvVarNames.BIN_PATH_SCP,
-    "ssh-copy-id": EnvVarNames.BIN_PATH_SSH_COPY_ID,
-    "sshpass": EnvVarNames.BIN_PATH_SSHPASS,
+    "sftp": EnvVarNames.BIN_PATH_SFTP,
     "umount": EnvVarNames.BIN_PATH_UMOUNT,
     "mount": EnvVarNames.BIN_PATH_MOUNT,
 }
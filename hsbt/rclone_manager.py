@@ -1,10 +1,14 @@
 from pathlib import Path, PurePath
+import os
+import shutil
+import shlex
+import configparser
 import logging
-from typing import List, Union, Dict
-import json
+from typing import List, Union, Dict, Tuple
 from hsbt.storage_box_manager import HetznerStorageBox
 from hsbt.utils import ConfigFileEditor
-from hsbt.utils import cast_path, run_command
+from hsbt.utils import cast_path, run_command, json_loads, write_file_atomic
+from hsbt.env_var_names import EnvVarNames
 
 log = logging.getLogger(__name__)
 
@@ -17,7 +21,16 @@ class Rclone:
     ):
         self.storage_box_manager = storage_box_manager
         self.config_file_path: Path = cast_path(config_file_path)
-        self.binaries: Dict[str, str] = {"rclone": "rclone"}
+        # resolve the binary once, instead of a PATH lookup by every spawned command
+        rclone_binary = os.environ.get(EnvVarNames.BIN_PATH_RCLONE.value, "rclone")
+        self.binaries: Dict[str, str] = {
+            "rclone": shutil.which(rclone_binary) or rclone_binary
+        }
+        # (config file st_mtime_ns, parsed `rclone config dump`)
+        self._config_dump_cache: Tuple[int | None, Dict] | None = None
+
+    def _get_config_file_args(self) -> List[str]:
+        return [f"--config={self.config_file_path}"] if self.config_file_path else []
 
     def _get_config_file_param(self, prefix: str = "--") -> str:
         return (
@@ -26,24 +39,100 @@ class Rclone:
             else ""
         )
 
+    def _get_config_file_mtime(self) -> int | None:
+        if not self.config_file_path:
+            return None
+        try:
+            return os.stat(self.config_file_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_config_file(self) -> configparser.RawConfigParser | None:
+        """Parse the rclone config file in-process. Returns None if there is no explicit config file or the file is not plain INI (e.g. an encrypted rclone config), rclone has to handle it then."""
+        if not self.config_file_path:
+            return None
+        parser = configparser.RawConfigParser()
+        # keep keys as rclone wrote them
+        parser.optionxform = str
+        try:
+            parser.read_string(self.config_file_path.read_text())
+        except FileNotFoundError:
+            pass
+        except configparser.Error:
+            return None
+        return parser
+
+    def _get_config_dump(self) -> Dict:
+        mtime = self._get_config_file_mtime()
+        if self._config_dump_cache is not None and self._config_dump_cache[0] == mtime:
+            return self._config_dump_cache[1]
+        parser = self._load_config_file()
+        if parser is not None:
+            configs = {section: dict(parser[section]) for section in parser.sections()}
+        else:
+            result = run_command(
+                [self.binaries["rclone"], "-q"]
+                + self._get_config_file_args()
+                + ["config", "dump"]
+            )
+            configs = json_loads(result.stdout)
+        self._config_dump_cache = (mtime, configs)
+        return configs
+
+    def _write_config_section(self, name: str, config: Dict[str, str]):
+        """Replace the `[name]` section of the config file or append it. All other lines, comments included, are kept as they are"""
+        try:
+            lines = self.config_file_path.read_text().splitlines(keepends=True)
+        except FileNotFoundError:
+            lines = []
+        section = [f"[{name}]\n"] + [
+            f"{key} = {value}\n" for key, value in config.items()
+        ]
+        start = next(
+            (i for i, line in enumerate(lines) if line.strip() == f"[{name}]"), None
+        )
+        if start is None:
+            if lines and not lines[-1].endswith("\n"):
+                lines[-1] += "\n"
+            if lines and lines[-1].strip():
+                lines.append("\n")
+            lines.extend(section)
+        else:
+            end = next(
+                (
+                    i
+                    for i in range(start + 1, len(lines))
+                    if lines[i].lstrip().startswith("[")
+                ),
+                len(lines),
+            )
+            # comments and blank lines in front of the following section belong to it
+            while end > start + 1 and (
+                not lines[end - 1].strip() or lines[end - 1].lstrip()[0] in "#;"
+            ):
+                end -= 1
+            if end < len(lines) and lines[end].strip():
+                section.append("\n")
+            lines[start:end] = section
+        # rclone.conf holds the user's other remotes as well, never leave it half written
+        write_file_atomic(
+            self.config_file_path, "".join(lines).encode(), new_file_mode=0o600
+        )
+
     def get_existing_config(self, name: str, missing_ok: bool = False) -> Dict | None:
-        command = f"""{self.binaries['rclone']} -q {self._get_config_file_param()} config dump"""
-        result = run_command(command)
-        configs = json.loads(result.stdout)
+        configs = self._get_config_dump()
         if name in configs:
             return configs[name]
         if missing_ok:
             return None
         raise ValueError(f"Can not find a rclone config by the name '{name}'")
 
-    def generate_config_file_if_not_exists(self) -> bool:
+    def generate_config_file_if_not_exists(self, use_rclone_cli: bool = False) -> bool:
         config = dict(
             type="sftp",
             host=self.storage_box_manager.host,
             user=self.storage_box_manager.user,
-            known_hosts_file=str(
-                self.storage_box_manager.key_manager._get_known_host_path()
-            ),
+            known_hosts_file=str(self.storage_box_manager.key_manager.known_host_path),
             port="23",
             key_file=str(self.storage_box_manager.key_manager.private_key_path),
         )
@@ -53,10 +142,26 @@ class Rclone:
         if existing_config == config:
             # all cool. nothing to do
             return False
+        parser = None if use_rclone_cli else self._load_config_file()
+        if parser is not None:
+            # a sftp remote with key file auth has no obfuscated secrets, we can write the INI section ourselves
+            log.debug(f"Write rclone config to '{self.config_file_path}'")
+            self._write_config_section(
+                self.storage_box_manager.key_manager.identifier, config
+            )
+            self._config_dump_cache = None
+            return True
         # https://rclone.org/commands/rclone_config_create/
-        command = f"""{self.binaries['rclone']} {self._get_config_file_param()} config create {self.storage_box_manager.key_manager.identifier} sftp {' '.join(k+' "'+v+'"' for k,v in config.items())}"""
+        command = (
+            [self.binaries["rclone"]]
+            + self._get_config_file_args()
+            + ["config", "create", self.storage_box_manager.key_manager.identifier]
+            + ["sftp"]
+            + [arg for key_value in config.items() for arg in key_value]
+        )
         log.debug(f"Create rclone config")
         run_command(command)
+        self._config_dump_cache = None
         return True
 
     def bisync_storage_box(
@@ -86,8 +191,16 @@ class Rclone:
         )
 
     def mount(self, local_dir: str):
-        command = f"{self.binaries['rclone']} {self._get_config_file_param()} mount {self.storage_box_manager.key_manager.identifier}:{self.storage_box_manager.remote_base_path} {local_dir}"
-        print(command)
+        command = (
+            [self.binaries["rclone"]]
+            + self._get_config_file_args()
+            + [
+                "mount",
+                f"{self.storage_box_manager.key_manager.identifier}:{self.storage_box_manager.remote_base_path}",
+                str(local_dir),
+            ]
+        )
+        print(shlex.join(command))
         cast_path(local_dir).mkdir(exist_ok=True, parents=True)
         run_command(command)
 
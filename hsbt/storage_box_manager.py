@@ -1,9 +1,21 @@
-from typing import Union, Dict, List, Literal
+from typing import Union, Dict, List, Literal, Iterator, Iterable, Tuple
+from contextlib import contextmanager
 import logging
-from pathlib import Path, PurePath
+from pathlib import Path
 import os
+import stat
+import asyncio
+import posixpath
+import time
+import shlex
+import hashlib
+import tempfile
 from hsbt.utils import (
+    json_dumps_bytes,
+    json_loads,
     run_command,
+    run_command_async,
+    iter_command_lines,
     cast_path,
     convert_df_output_to_dict,
     ConfigFileEditor,
@@ -11,14 +23,106 @@ from hsbt.utils import (
     FileInfoCollection,
     FileInfo,
     parse_ls_l_output,
+    iter_ls_l_output,
 )
 from hsbt.key_manager import KeyManager
 from hsbt.connection_manager import ConnectionManager
 
-import uuid
-
 log = logging.getLogger(__name__)
 
+# ssh multiplexing sockets and the askpass helper. `%C` is a hash of local host, remote host, port and user and keeps the socket path short
+# the path has to be stable to share masters between hsbt runs, `_ensure_control_socket_dir` makes sure it is really ours
+_CONTROL_SOCKET_DIR = Path(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"hsbt-{os.getuid()}"
+)
+_CONTROL_PATH = str(_CONTROL_SOCKET_DIR / "cm-%C")
+
+# "user@host:port" -> {"fingerprint": sha256 of the public key, "ts": unix time of the last successful check}
+_KEY_DEPLOYED_CACHE_FILE = Path(
+    os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache", "hsbt", "deployed.json"
+)
+_KEY_DEPLOYED_CACHE_TTL_SEC = 86400
+
+# connection attempts per remote command, with an exponential backoff (0.1s, 0.2s) in between
+_SSH_CONNECT_ATTEMPTS = 3
+_SSH_CONNECT_RETRY_BASE_DELAY_SEC = 0.1
+# only errors raised before a session exists. A reset or closed connection may have run the remote command already
+_SSH_TRANSIENT_ERRORS = (
+    "Connection timed out",
+    "Connection refused",
+    "kex_exchange_identification",
+    "Network is unreachable",
+    "Temporary failure in name resolution",
+)
+
+
+_ASKPASS_PASSWORD_ENV = "HSBT_ASKPASS_PASSWORD"
+
+
+def _ensure_control_socket_dir() -> Path:
+    """Create the socket dir if needed. Refuse to use it, if it is not a directory owned by us with mode 0700 (e.g. created by another user in a shared /tmp)"""
+    try:
+        os.mkdir(_CONTROL_SOCKET_DIR, 0o700)
+        # mkdir is subject to the umask
+        os.chmod(_CONTROL_SOCKET_DIR, 0o700)
+    except FileExistsError:
+        pass
+    dir_stat = os.lstat(_CONTROL_SOCKET_DIR)
+    if (
+        not stat.S_ISDIR(dir_stat.st_mode)
+        or dir_stat.st_uid != os.getuid()
+        or stat.S_IMODE(dir_stat.st_mode) != 0o700
+    ):
+        raise PermissionError(
+            f"'{_CONTROL_SOCKET_DIR}' must be a directory owned by the current user with mode 0700. Please remove it or fix its permissions."
+        )
+    return _CONTROL_SOCKET_DIR
+
+
+def _get_askpass_script() -> Path:
+    """Tiny SSH_ASKPASS helper that answers ssh's password prompt from the environment, so no `sshpass` binary is needed"""
+    script = _ensure_control_socket_dir() / "askpass.sh"
+    # (re)write it if it is missing, e.g. removed by a tmp cleanup while a long running process uses it
+    if not script.is_file():
+        fd = os.open(script, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o700)
+        with open(fd, "w") as file:
+            file.write(f'#!/bin/sh\nprintf "%s\\n" "${_ASKPASS_PASSWORD_ENV}"\n')
+    return script
+
+
+def _get_password_envs(pw: str) -> Dict[str, str]:
+    # SSH_ASKPASS_REQUIRE needs OpenSSH >= 8.4
+    return {
+        "SSH_ASKPASS": str(_get_askpass_script()),
+        "SSH_ASKPASS_REQUIRE": "force",
+        _ASKPASS_PASSWORD_ENV: pw,
+    }
+
+
+def _sftp_quote(path: str | Path) -> str:
+    """Quote a path for a sftp batch file command"""
+    return '"' + str(path).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _local_path_str(path: str | Path) -> str:
+    return os.path.expanduser(os.fspath(path))
+
+
+def _read_key_deployed_cache() -> Dict:
+    try:
+        return json_loads(_KEY_DEPLOYED_CACHE_FILE.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_key_deployed_cache(cache: Dict):
+    try:
+        _KEY_DEPLOYED_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _KEY_DEPLOYED_CACHE_FILE.write_bytes(json_dumps_bytes(cache))
+    except OSError as e:
+        # the cache is only an optimization
+        log.debug(f"Could not write '{_KEY_DEPLOYED_CACHE_FILE}': {e}")
+
 
 class DeployKeyPasswordMissingError(Exception):
     pass
@@ -49,13 +153,19 @@ class HetznerStorageBox:
         self.key_manager: KeyManager = key_manager
         self.binaries: Dict[str, str] = {
             "ssh": "ssh",
-            "ssh-copy-id": "ssh-copy-id",
-            "scp": "scp",
+            "sftp": "sftp",
             "sshfs": "sshfs",
-            "sshpass": "sshpass",
             "umount": "umount",
             "mount": "mount",
         }
+        self._key_deployed_cache: bool | None = None
+        self._pending_mkdirs: set[str] = set()
+        # normalized remote dir -> parsed `ls -la` output. Only changes made through this instance invalidate entries
+        self._ls_cache: Dict[str, FileInfoCollection] = {}
+        # password auth (bool) -> ssh option argv items that only depend on instance attributes
+        self._base_ssh_args: Dict[bool, Tuple[str, ...]] = {}
+        # True if the multiplexing master was started by this instance. A master owned by someone else is left running
+        self._owns_master: bool = False
 
     @classmethod
     def from_connection(cls, con: ConnectionManager.Connection):
@@ -67,45 +177,174 @@ class HetznerStorageBox:
         )
 
     def _create_remote_directory(self, path: str | Path):
-        path = cast_path(path)
-        if not isinstance(path, Path):
-            path: Path = Path(path)
-        self.run_remote_command(f"mkdir -p {path}")
+        self.invalidate_remote_listing(path)
+        self.run_remote_command(f"mkdir -p {shlex.quote(os.fspath(path))}")
 
     def create_remote_directory(self, path: str | Path):
-        path = cast_path([path])
-        self.run_remote_command(f"mkdir -p {path}")
+        """Create `path` (`mkdir -p`) right away. Directories queued with `queue_remote_directory` are created in the same call"""
+        self.queue_remote_directory(path)
+        self.flush_pending()
+
+    def queue_remote_directory(self, path: str | Path):
+        """Queue a `mkdir -p` without running it. Queued directories are created with one ssh call by the next remote command,
+        `flush_pending()` or at the end of a `with` block. Without any of these, the directory is never created
+        """
+        self._pending_mkdirs.add(self._inject_base_path_to_abs_path(path))
+
+    def create_remote_directories(self, paths: Iterable[str | Path]):
+        """Create all `paths` with one `mkdir -p` call"""
+        for path in paths:
+            self.queue_remote_directory(path)
+        self.flush_pending()
+
+    def flush_pending(self):
+        """Create all directories queued with `queue_remote_directory`"""
+        if not self._pending_mkdirs:
+            return
+        self.run_remote_command(self._pop_pending_mkdir_command())
+
+    def _pop_pending_mkdir_command(self) -> str:
+        paths = sorted(self._pending_mkdirs)
+        self._pending_mkdirs.clear()
+        for path in paths:
+            self.invalidate_remote_listing(path)
+        return "mkdir -p " + " ".join(shlex.quote(p) for p in paths)
 
     def _upload_file(self, local_path: str | Path, remote_path: str | Path):
-        remote_path: Path = cast_path(remote_path)
-        local_path: Path = cast_path(local_path)
-        self.run_remote_command(
-            f":{str(remote_path)}", extra_params={str(local_path): ""}, executor="scp"
+        self.invalidate_remote_listing(remote_path)
+        self._run_sftp_batch(
+            [f"put {_sftp_quote(local_path)} {_sftp_quote(remote_path)}"]
         )
 
     def upload_file(self, local_path: str | Path, remote_path: str | Path):
-        remote_path: Path = self._inject_base_path_to_abs_path(remote_path)
-        local_path: Path = cast_path(local_path)
+        remote_path = self._inject_base_path_to_abs_path(remote_path)
+        local_path = _local_path_str(local_path)
         self._upload_file(local_path=local_path, remote_path=remote_path)
 
+    def upload_files(
+        self, files: Iterable[Tuple[str | Path, str | Path]], sessions: int = 1
+    ):
+        """Upload many `(local_path, remote_path)` pairs in one sftp session.
+        With `sessions` > 1 the files are spread over that many concurrent sftp sessions, which share the multiplexed ssh connection.
+        """
+        put_commands = []
+        for local_path, remote_path in files:
+            remote_path = self._inject_base_path_to_abs_path(remote_path)
+            self.invalidate_remote_listing(remote_path)
+            put_commands.append(
+                f"put {_sftp_quote(_local_path_str(local_path))} {_sftp_quote(remote_path)}"
+            )
+        if not put_commands:
+            return
+        sessions = max(1, min(sessions, len(put_commands)))
+        if sessions == 1:
+            self._run_sftp_batch(put_commands)
+            return
+        from concurrent.futures import ThreadPoolExecutor
+
+        # queued directories must exist before any of the parallel sessions starts
+        self.flush_pending()
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            # consume the results to re-raise errors of the sessions
+            list(
+                executor.map(
+                    self._run_sftp_batch,
+                    [put_commands[i::sessions] for i in range(sessions)],
+                )
+            )
+
+    def upload_directory(
+        self, local_dir: str | Path, remote_dir: str | Path, concurrency: int = 8
+    ):
+        """Upload the content of `local_dir` into `remote_dir`. The files are spread over `concurrency` sftp sessions (see `upload_files`)."""
+        local_dir = _local_path_str(local_dir)
+        remote_dir = os.fspath(remote_dir)
+        files: List[Tuple[str, str]] = []
+        for dir_path, _, file_names in os.walk(local_dir):
+            relative_dir = os.path.relpath(dir_path, local_dir).replace(os.sep, "/")
+            remote_sub_dir = posixpath.normpath(
+                posixpath.join(remote_dir, relative_dir)
+            )
+            # all directories are created with one `mkdir -p`, before the sessions start
+            self.queue_remote_directory(remote_sub_dir)
+            files.extend(
+                (os.path.join(dir_path, name), posixpath.join(remote_sub_dir, name))
+                for name in file_names
+            )
+        self.flush_pending()
+        self.upload_files(files, sessions=concurrency)
+
+    def download_directory(self, remote_dir: str | Path, local_dir: str | Path):
+        """Download the content of `remote_dir` into `local_dir` with one recursive sftp `get`"""
+        remote_dir = self._inject_base_path_to_abs_path(remote_dir)
+        local_dir = _local_path_str(local_dir)
+        os.makedirs(local_dir, exist_ok=True)
+        # `<dir>/.` makes sftp copy the content of the dir into the existing local dir, instead of a sub dir named like the remote dir
+        self._run_sftp_batch(
+            [
+                f"get -R {_sftp_quote(posixpath.join(remote_dir, '.'))} {_sftp_quote(local_dir)}"
+            ]
+        )
+
     def download_file(self, remote_path: str | Path, local_path: str | Path):
-        remote_path: Path = self._inject_base_path_to_abs_path(remote_path)
-        local_path: Path = cast_path(local_path)
+        remote_path = self._inject_base_path_to_abs_path(remote_path)
+        local_path = _local_path_str(local_path)
         self._download_file(remote_path=remote_path, local_path=local_path)
 
     def _download_file(self, remote_path: str | Path, local_path: str | Path):
-        remote_path: Path = cast_path(remote_path)
-        local_path: Path = cast_path(local_path)
-        self.run_remote_command(
-            f":{str(remote_path)} {str(local_path)}", executor="scp"
+        self._run_sftp_batch(
+            [f"get {_sftp_quote(remote_path)} {_sftp_quote(local_path)}"]
+        )
+
+    def _run_sftp_batch(self, batch_commands: List[str]) -> CommandResult:
+        # sftp keeps up to 64 requests of 128KiB in flight (256KiB is the sftp-server message limit incl. headers)
+        return self.run_remote_command(
+            "",
+            executor="sftp",
+            extra_params={"-b ": "-", "-R ": "64", "-B ": "131072"},
+            return_stdout_only=False,
+            stdin_data=("\n".join(batch_commands) + "\n").encode(),
         )
 
     def _list_remote_files(self, remote_path: str | Path) -> FileInfoCollection:
-        remote_path = cast_path(remote_path)
-        return parse_ls_l_output(self.run_remote_command(f"ls -la {remote_path}"))
+        remote_path = posixpath.normpath(os.fspath(remote_path))
+        if remote_path not in self._ls_cache:
+            self._ls_cache[remote_path] = parse_ls_l_output(
+                self.run_remote_command(f"ls -la {shlex.quote(remote_path)}")
+            )
+        return self._ls_cache[remote_path]
+
+    def iter_remote_files(self, remote_path: str | Path = ".") -> Iterator[FileInfo]:
+        """Like `list_remote_files`, but parses the `ls -la` output while it arrives. For big remote directories."""
+        remote_path = posixpath.normpath(
+            self._inject_base_path_to_abs_path(remote_path)
+        )
+        if remote_path in self._ls_cache:
+            yield from self._ls_cache[remote_path].values()
+            return
+        self.flush_pending()
+        remote_command, _ = self._build_remote_command(
+            f"ls -la {shlex.quote(remote_path)}"
+        )
+        yield from iter_ls_l_output(iter_command_lines(remote_command))
+
+    def invalidate_remote_listing(self, path: str | Path = None):
+        """Drop cached listings of `path` and all its parent dirs, or the whole cache if no path is given.
+        Needed after changing the remote storage without this instance, e.g. via `run_remote_command`.
+        """
+        if path is None:
+            self._ls_cache.clear()
+            return
+        path = posixpath.normpath(os.fspath(path))
+        while True:
+            self._ls_cache.pop(path, None)
+            parent = posixpath.dirname(path) or "."
+            if parent == path:
+                return
+            path = parent
 
     def list_remote_files(self, remote_path: str | Path = ".") -> FileInfoCollection:
-        remote_path: Path = self._inject_base_path_to_abs_path(remote_path)
+        remote_path = self._inject_base_path_to_abs_path(remote_path)
         return self._list_remote_files(remote_path)
 
     def get_available_space(self, human_readable_file_sizes: bool = False) -> Dict:
@@ -118,32 +357,18 @@ class HetznerStorageBox:
         if key_manager is None:
             key_manager = KeyManager(identifier=self.host)
         self.key_manager = key_manager
+        self._base_ssh_args.clear()
 
     def get_key_manager(self) -> KeyManager:
         if self.key_manager is None:
             self.add_key_manager()
         return self.key_manager
 
-    def _get_remote_authorized_keys(
-        self, generate_empty_file_if_not_exist: bool = True
-    ) -> Path:
-        target_local_path: Path = Path(f"/tmp/{uuid.uuid4().hex}")
-        if (
-            self._list_remote_files(".").get_file_info(".ssh") is None
-            or self._list_remote_files(".ssh").get_file_info("authorized_keys") is None
-        ) and generate_empty_file_if_not_exist:
-            self.run_remote_command("mkdir -p .ssh")
-            self.run_remote_command("touch .ssh/authorized_keys")
-        self._download_file(
-            remote_path=".ssh/authorized_keys", local_path=target_local_path
-        )
-        return target_local_path
-
     def deploy_public_key_if_not_done(self, sftp_mode: bool = False) -> bool:
         """_summary_
 
         Args:
-            sftp_mode (bool, optional): _description_. Defaults to False.
+            sftp_mode (bool, optional): Unused. Was needed for `ssh-copy-id` on sftp-only boxes, `install-ssh-key` works for all. Defaults to False.
 
         Raises:
             DeployKeyPasswordMissingError: _description_
@@ -168,29 +393,67 @@ class HetznerStorageBox:
             raise DeployKeyPasswordMissingError(
                 f"To deploy your public SSH Key (`{self.key_manager.public_key_path}`) at `{self.host}` the first time, storage box password must be provided. After that future connections will be authorized by the deployed key and no password is required anymore."
             )
-        options = {"-s": ""} if sftp_mode else {}
+        # https://docs.hetzner.com/robot/storage-box/backup-space-ssh-keys
+        # one ssh call with the key piped to the storage box's own key installer, instead of the multi connection ssh-copy-id script
         result: CommandResult = self.run_remote_command(
-            "",
-            executor="ssh-copy-id",
-            extra_params={"-i ": str(self.key_manager.public_key_path)} | options,
+            "install-ssh-key",
+            pw=self.password,
+            on_keyauth_fail_retry_with_pw_auth=False,
             verbose=False,
             return_stdout_only=False,
             raise_error=False,
+            stdin_data=self.key_manager.get_public_key(),
         )
-        if 'ssh-copy-id is only supported with the "-s" argument.' in result.stdout:
-            return self.deploy_public_key_if_not_done(sftp_mode=True)
-        elif result.error_for_raise:
+        # install-ssh-key may have created .ssh/authorized_keys
+        self.invalidate_remote_listing()
+        if result.error_for_raise:
             raise result.error_for_raise
-
+        self._set_key_deployed_cache(True)
         return True
 
-    def public_key_is_deployed(self) -> bool:
+    def _key_deployed_cache_key(self) -> str:
+        return f"{self.user}@{self.host}:{self.port}"
+
+    def _public_key_fingerprint(self) -> str | None:
+        try:
+            return hashlib.sha256(self.key_manager.get_public_key().strip()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def _key_deployment_is_cached(self) -> bool:
+        if self._key_deployed_cache:
+            return True
+        entry = _read_key_deployed_cache().get(self._key_deployed_cache_key())
+        self._key_deployed_cache = (
+            entry is not None
+            and time.time() - entry.get("ts", 0) < _KEY_DEPLOYED_CACHE_TTL_SEC
+            and entry.get("fingerprint") == self._public_key_fingerprint()
+        )
+        return self._key_deployed_cache
+
+    def _set_key_deployed_cache(self, deployed: bool):
+        self._key_deployed_cache = deployed
+        cache = _read_key_deployed_cache()
+        if deployed:
+            cache[self._key_deployed_cache_key()] = {
+                "fingerprint": self._public_key_fingerprint(),
+                "ts": time.time(),
+            }
+        elif cache.pop(self._key_deployed_cache_key(), None) is None:
+            return
+        _write_key_deployed_cache(cache)
+
+    def public_key_is_deployed(self, use_cache: bool = True) -> bool:
         # https://docs.hetzner.com/de/robot/storage-box/backup-space-ssh-keys
         self.get_key_manager()
+        if use_cache and self._key_deployment_is_cached():
+            return True
+        # the return code tells everything we need. no verbose output, fail fast and never prompt
         command_result: CommandResult = self.run_remote_command(
             "exit",
             on_keyauth_fail_retry_with_pw_auth=False,
-            verbose=True,
+            verbose=False,
+            extra_params={"-o ConnectTimeout=": "5", "-o BatchMode=": "yes"},
             return_stdout_only=False,
             raise_error=False,
         )
@@ -198,8 +461,10 @@ class HetznerStorageBox:
             log.debug(
                 f"Your local public key ('{self.key_manager.public_key_path}') is probably not deployed at your Hetzner Storage Box ('{self.host}'). Check debug output for more details if needed. Executed command: `{command_result.command}`, Result error code: `{command_result.return_code}`, debug output: `{command_result.stderr}`"
             )
+            self._set_key_deployed_cache(False)
             return False
         elif command_result.return_code == 0:
+            self._set_key_deployed_cache(True)
             return True
         else:
             log.error("Could determine if key is deployd")
@@ -210,6 +475,7 @@ class HetznerStorageBox:
         verbose: bool = True,
         extra_params: Dict = None,
         only_ssh_o_options: bool = False,
+        multiplex: bool = True,
     ) -> Dict:
         options: Dict = {}
         if verbose:
@@ -217,8 +483,11 @@ class HetznerStorageBox:
                 "-v": "",
             }
         options = options | {
-            "-o UserKnownHostsFile=": str(self.key_manager._get_known_host_path()),
+            "-o UserKnownHostsFile=": str(self.key_manager.known_host_path),
             "-o Port=": "23",
+            # the host key is pinned in our own known_hosts file, no need for an additional lookup by ip
+            "-o CheckHostIP=": "no",
+            "-o HashKnownHosts=": "yes",
         }
 
         if pw:
@@ -226,6 +495,9 @@ class HetznerStorageBox:
                 "-o PreferredAuthentications=": "password",
                 "-o PasswordAuthentication=": "yes",
                 "-o PubkeyAuthentication=": "no",
+                # `sftp -b` adds BatchMode=yes which disables the askpass prompt. ssh takes the first value
+                # it sees, so this has to stay in front of the extra params
+                "-o BatchMode=": "no",
             }
         else:
             options = options | {
@@ -236,7 +508,17 @@ class HetznerStorageBox:
                 "-o IdentitiesOnly=": "yes",
                 "-o PubkeyAuthentication=": "yes",
             }
-        # it is important to keep adding extra params at the end. this enables the caller to add string just before {self.user}@{self.host} so we can create scp commands as well
+            if multiplex:
+                # the first connection becomes a master, following ones reuse its tcp connection and auth.
+                # only for key auth, a password authenticated master would make the key deployment check pass
+                # the socket dir is created on first use, not for instances that never connect
+                _ensure_control_socket_dir()
+                options = options | {
+                    "-o ControlMaster=": "auto",
+                    "-o ControlPath=": _CONTROL_PATH,
+                    "-o ControlPersist=": "10m",
+                }
+        # it is important to keep adding extra params at the end. this enables the caller to add string just before {self.user}@{self.host} so we can create sftp commands as well
         if extra_params:
             options = options | extra_params
         if only_ssh_o_options:
@@ -248,30 +530,93 @@ class HetznerStorageBox:
 
         return options
 
+    @staticmethod
+    def _ssh_options_to_args(options: Dict) -> List[str]:
+        """Convert `_get_ssh_options` output (e.g. `{"-o Port=": "23", "-v": ""}`) into argv items"""
+        args = []
+        for key, val in options.items():
+            flag, _, rest = key.partition(" ")
+            args.append(flag)
+            if rest or val:
+                args.append(rest + val)
+        return args
+
+    def _get_base_ssh_args(self, pw: str = None) -> Tuple[str, ...]:
+        pw_auth = bool(pw)
+        args = self._base_ssh_args.get(pw_auth)
+        if args is None:
+            args = tuple(
+                self._ssh_options_to_args(self._get_ssh_options(pw=pw, verbose=False))
+            )
+            self._base_ssh_args[pw_auth] = args
+        return args
+
+    def run_remote_commands(
+        self, commands: List[str], **run_remote_command_kwargs
+    ) -> str | CommandResult:
+        """Run multiple commands in one ssh session. Stops at the first failing command."""
+        return self.run_remote_command(
+            " && ".join(commands), **run_remote_command_kwargs
+        )
+
+    @contextmanager
+    def persistent_connection(self) -> Iterator["HetznerStorageBox"]:
+        """Keep one multiplexing master connection open while the context is active, all key authenticated commands run through it."""
+        self._start_master_connection()
+        try:
+            yield self
+            self.flush_pending()
+        finally:
+            self.close()
+
+    def __enter__(self) -> "HetznerStorageBox":
+        """`with HetznerStorageBox(...) as box:` is the same as `with box.persistent_connection():`"""
+        self._start_master_connection()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.flush_pending()
+        finally:
+            self.close()
+
+    def _start_master_connection(self):
+        self.get_key_manager()
+        if self._run_control_command("check").return_code != 0:
+            run_command(
+                [self.binaries["ssh"], *self._get_base_ssh_args()]
+                + ["-M", "-N", "-f", f"{self.user}@{self.host}"]
+            )
+            self._owns_master = True
+
     def run_remote_command(
         self,
         command: str,
         pw: str = None,
-        executor: Literal["ssh", "scp", "ssh-copy-id"] = "ssh",
+        executor: Literal["ssh", "sftp"] = "ssh",
         on_keyauth_fail_retry_with_pw_auth: bool = True,
         extra_params: Dict = None,
         verbose: bool = False,
         return_stdout_only: bool = True,
         raise_error: bool = True,
         dry_run: bool = False,
+        stdin_data: bytes = None,
     ) -> str | CommandResult:
-        """_summary_
+        """Run `command` at the storage box. Cached remote listings are not touched,
+        call `invalidate_remote_listing()` after commands that change the remote files.
 
         Args:
             command (str): _description_
             pw (str, optional): _description_. Defaults to None.
-            executor (Literal["ssh", "scp", "ssh"], optional): _description_. Defaults to "ssh".
+            executor (Literal["ssh", "sftp"], optional): _description_. Defaults to "ssh".
             on_keyauth_fail_retry_with_pw_auth (bool, optional): _description_. Defaults to True.
             extra_params (Dict, optional): _description_. Defaults to None.
             verbose (bool, optional): _description_. Defaults to False.
             return_stdout_only (bool, optional): _description_. Defaults to True.
             raise_error (bool, optional): _description_. Defaults to True.
             dry_run (bool, optional): Only generate and return the command. Do not execute it. Defaults to False.
+            stdin_data (bytes, optional): Data to pipe into the remote command. Defaults to None.
 
         Raises:
             command_result.error_for_raise: _description_
@@ -279,34 +624,33 @@ class HetznerStorageBox:
         Returns:
             str | CommandResult: _description_
         """
-        options = self._get_ssh_options(
-            pw=pw, verbose=verbose, extra_params=extra_params
+        if self._pending_mkdirs and not dry_run:
+            self.flush_pending()
+        remote_command, password_envs = self._build_remote_command(
+            command,
+            pw=pw,
+            executor=executor,
+            extra_params=extra_params,
+            verbose=verbose,
         )
-        if executor == "ssh":
-            # ssh commands are added after the base command. scp param/path is added directly to the remote {self.user}@{self.host} part.
-            # therefore we need to add a space to ssh commands
-            command = f" {command}"
-        executor_binary = self.binaries[executor]
-        sshpass_binary = self.binaries["sshpass"]
-        sshpass = f"{sshpass_binary + ' -e '}" if pw else ""
-        if dry_run and pw:
-            # dry run can be used to generate command. We contain the password to make the command to be able to be executed as it is
-            sshpass = f" {sshpass_binary} -p {pw} "
-        remote_command = f"{sshpass}{executor_binary} {' '.join([k+v for k,v in options.items()])} {self.user}@{self.host}{command}"
         if dry_run:
-            return CommandResult(command=remote_command)
-        command_result = run_command(
-            remote_command, extra_envs={"SSHPASS": pw} if pw else {}, raise_error=False
-        )
-        if (
-            command_result.return_code != 0
-            and on_keyauth_fail_retry_with_pw_auth
-            and self.password is not None
-        ):
-            # return code 255 means a ssh error. No connection could be established
-            # propably there is an problem with the ssh key or its just not deployed yet.
-            # if the password provided by the caller in this 'HetznerStorageBox'-instance we can retry it with a password provided connection
-
+            if password_envs:
+                # dry run can be used to generate command. We contain the password to make the command to be able to be executed as it is
+                return CommandResult(
+                    command=f"{' '.join(k + '=' + shlex.quote(v) for k, v in password_envs.items())} {shlex.join(remote_command)}"
+                )
+            return CommandResult(command=shlex.join(remote_command))
+        for attempt in range(_SSH_CONNECT_ATTEMPTS):
+            command_result = run_command(
+                remote_command,
+                extra_envs=password_envs,
+                raise_error=False,
+                stdin_data=stdin_data,
+            )
+            if not self._retry_after_connect_error(command_result, attempt):
+                break
+            time.sleep(_SSH_CONNECT_RETRY_BASE_DELAY_SEC * 2**attempt)
+        if self._retry_with_pw_auth(command_result, on_keyauth_fail_retry_with_pw_auth):
             log.debug(
                 f"Retry ssh remote command '{command}' with password authentication"
             )
@@ -319,11 +663,139 @@ class HetznerStorageBox:
                 verbose=verbose,
                 return_stdout_only=return_stdout_only,
                 raise_error=raise_error,
+                stdin_data=stdin_data,
+            )
+        elif command_result.return_code != 0 and raise_error:
+            raise command_result.error_for_raise
+        return command_result.stdout if return_stdout_only else command_result
+
+    async def run_remote_command_async(
+        self,
+        command: str,
+        pw: str = None,
+        executor: Literal["ssh", "sftp"] = "ssh",
+        on_keyauth_fail_retry_with_pw_auth: bool = True,
+        extra_params: Dict = None,
+        verbose: bool = False,
+        return_stdout_only: bool = True,
+        raise_error: bool = True,
+        stdin_data: bytes = None,
+    ) -> str | CommandResult:
+        """asyncio variant of `run_remote_command`. Independent remote commands can be awaited together and share their wall-clock time.
+        Queued directories are created by the first call, call `flush_pending()` before gathering commands that depend on them.
+        """
+        if self._pending_mkdirs:
+            await self.run_remote_command_async(self._pop_pending_mkdir_command())
+        remote_command, password_envs = self._build_remote_command(
+            command,
+            pw=pw,
+            executor=executor,
+            extra_params=extra_params,
+            verbose=verbose,
+        )
+        for attempt in range(_SSH_CONNECT_ATTEMPTS):
+            command_result = await run_command_async(
+                remote_command,
+                extra_envs=password_envs,
+                raise_error=False,
+                stdin_data=stdin_data,
+            )
+            if not self._retry_after_connect_error(command_result, attempt):
+                break
+            await asyncio.sleep(_SSH_CONNECT_RETRY_BASE_DELAY_SEC * 2**attempt)
+        if self._retry_with_pw_auth(command_result, on_keyauth_fail_retry_with_pw_auth):
+            log.debug(
+                f"Retry ssh remote command '{command}' with password authentication"
+            )
+            return await self.run_remote_command_async(
+                command=command,
+                pw=self.password,
+                executor=executor,
+                on_keyauth_fail_retry_with_pw_auth=False,
+                extra_params=extra_params,
+                verbose=verbose,
+                return_stdout_only=return_stdout_only,
+                raise_error=raise_error,
+                stdin_data=stdin_data,
             )
         elif command_result.return_code != 0 and raise_error:
             raise command_result.error_for_raise
         return command_result.stdout if return_stdout_only else command_result
 
+    def _build_remote_command(
+        self,
+        command: str,
+        pw: str = None,
+        executor: Literal["ssh", "sftp"] = "ssh",
+        extra_params: Dict = None,
+        verbose: bool = False,
+    ) -> Tuple[List[str], Dict[str, str]]:
+        remote_command = [self.binaries[executor]]
+        if verbose:
+            remote_command.append("-v")
+        remote_command.extend(self._get_base_ssh_args(pw))
+        if extra_params:
+            # it is important to keep adding extra params at the end, just before {self.user}@{self.host}
+            remote_command.extend(self._ssh_options_to_args(extra_params))
+        if executor == "ssh":
+            # ssh hands the command over to the remote shell as it is, one argv item is enough
+            remote_command.append(f"{self.user}@{self.host}")
+            if command:
+                remote_command.append(command)
+        else:
+            # sftp param/path is added directly to the remote {self.user}@{self.host} part.
+            remote_command.append(f"{self.user}@{self.host}{command}")
+        return remote_command, _get_password_envs(pw) if pw else {}
+
+    def _retry_with_pw_auth(
+        self, command_result: CommandResult, on_keyauth_fail_retry_with_pw_auth: bool
+    ) -> bool:
+        # return code 255 means a ssh error. No connection could be established
+        # propably there is an problem with the ssh key or its just not deployed yet.
+        # if the password provided by the caller in this 'HetznerStorageBox'-instance we can retry it with a password provided connection
+        # any other return code is the exit code of the remote command, and if the key is known to be deployed a password will not help either
+        return (
+            command_result.return_code == 255
+            and on_keyauth_fail_retry_with_pw_auth
+            and self.password is not None
+            and not self._key_deployed_cache
+            and "Permission denied" in (command_result.stderr or "")
+        )
+
+    @staticmethod
+    def _retry_after_connect_error(command_result: CommandResult, attempt: int) -> bool:
+        # 255 plus one of these messages is a network hiccup, worth another try. auth or host key errors are not
+        if command_result.return_code != 255 or attempt + 1 >= _SSH_CONNECT_ATTEMPTS:
+            return False
+        stderr = command_result.stderr or ""
+        if not any(message in stderr for message in _SSH_TRANSIENT_ERRORS):
+            return False
+        log.debug(f"Transient ssh connection error, retrying. {stderr}")
+        return True
+
+    def _run_control_command(self, control_command: Literal["check", "exit"]):
+        return run_command(
+            [
+                self.binaries["ssh"],
+                "-O",
+                control_command,
+                "-o",
+                f"ControlPath={_CONTROL_PATH}",
+                "-o",
+                f"Port={self.port}",
+                f"{self.user}@{self.host}",
+            ],
+            raise_error=False,
+        )
+
+    def close(self):
+        """Stop the multiplexing master connection to the storage box, if this instance started it.
+        A master shared with another process or instance keeps running and expires via ControlPersist
+        """
+        if self._owns_master:
+            self._run_control_command("exit")
+            self._owns_master = False
+
     def storage_box_is_mounted(self):
         # wip
         raise NotImplementedError()
@@ -336,7 +808,9 @@ class HetznerStorageBox:
             local_mountpoint = Path(f"/mnt/{self.key_manager.identifier}")
         else:
             local_mountpoint = cast_path(local_mountpoint)
-        options = self._get_ssh_options(pw=None, verbose=False, only_ssh_o_options=True)
+        options = self._get_ssh_options(
+            pw=None, verbose=False, only_ssh_o_options=True, multiplex=False
+        )
         # hackfix - PubkeyAuthentication is not compatible iwth fuse.sshfs
         options.pop("PubkeyAuthentication=")
         return f"""sudo {self.binaries['sshfs']} -o {",".join(k + v for k, v in options.items())},allow_other,default_permissions {self.user}@{self.host}:{self.remote_base_path} {local_mountpoint}"""
@@ -356,15 +830,34 @@ class HetznerStorageBox:
             local_mountpoint = cast_path(local_mountpoint)
         fstab = ConfigFileEditor(fstab_file)
         if remove:
-            run_command(f"{self.binaries['umount']} --fstab {fstab.target_file} -a")
+            if os.path.ismount(local_mountpoint):
+                run_command([self.binaries["umount"], str(local_mountpoint)])
             fstab.remove_config_entry(identifier)
         else:
-            fstab.set_config_entry(
+            entry_changed = fstab.set_config_entry(
                 fstab_entry,
                 identifier=identifier,
             )
+            if os.path.ismount(local_mountpoint):
+                if not entry_changed:
+                    log.debug(
+                        f"fstab entry for '{local_mountpoint}' is unchanged and mounted"
+                    )
+                    return
+                # `mount` refuses an already mounted target and fuse mounts do not support `-o remount`.
+                # unmount to pick up the changed options
+                run_command([self.binaries["umount"], str(local_mountpoint)])
             local_mountpoint.mkdir(parents=True, exist_ok=True)
-            run_command(f"{self.binaries['mount']} --fstab {fstab.target_file} -a")
+            # only mount our entry instead of every entry in the fstab (`-a`)
+            run_command(
+                [
+                    self.binaries["mount"],
+                    "--fstab",
+                    str(fstab.target_file),
+                    "--target",
+                    str(local_mountpoint),
+                ]
+            )
 
     def mount_storage_box_via_fstab_via_sshfs(
         self,
@@ -383,7 +876,9 @@ class HetznerStorageBox:
         user_id = str(user_id)
         group_id = str(group_id)
         identifier = f"{self.user}@{self.host}:{remote_dir} {local_mountpoint} {self.key_manager.identifier}"
-        options = self._get_ssh_options(pw=None, verbose=False, only_ssh_o_options=True)
+        options = self._get_ssh_options(
+            pw=None, verbose=False, only_ssh_o_options=True, multiplex=False
+        )
         # hackfix - PubkeyAuthentication is not compatible iwth fuse.sshfs
         options.pop("PubkeyAuthentication=")
         # /hackfix
@@ -447,9 +942,8 @@ class HetznerStorageBox:
     def temp_mount_storage_box_via_rclone():
         raise NotImplementedError()
 
-    def _inject_base_path_to_abs_path(self, path: str | Path):
-        path: Path = cast_path(path)
-        if path and len(path.parts) != 0 and path.parts[0] == "/":
-            # remove trailing slash to convert path into a "relative" path
-            path = Path(PurePath(*path.parts[1:]))
-        return Path(PurePath(self.remote_base_path, path))
+    def _inject_base_path_to_abs_path(self, path: str | Path) -> str:
+        # remote paths are plain posix strings, no need to parse them into `Path` objects for every file
+        # remove leading slashes to convert path into a "relative" path
+        path = os.fspath(path).lstrip("/")
+        return posixpath.join(os.fspath(self.remote_base_path), path)
@@ -1,15 +1,33 @@
 import os
+import json
 import zipfile
-import requests
 from pathlib import Path, PurePath
-from typing import Union, List, BinaryIO, Dict, Generator
+from typing import (
+    Union,
+    List,
+    BinaryIO,
+    Dict,
+    Any,
+    Iterable,
+    Iterator,
+    Tuple,
+)
 import subprocess
+import asyncio
+import shlex
+import tempfile
 import logging
-from dataclasses import dataclass, field
-from pydantic import BaseModel
+from dataclasses import dataclass
 import shutil
+import functools
+from contextlib import contextmanager
 from hsbt.env_var_names import EnvVarNames, EXECUTABLE_PATH_ENV_VAR_MAPPING
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 log = logging.getLogger(__name__)
 
@@ -18,13 +36,38 @@ def is_root():
     return os.geteuid() == 0
 
 
+def json_dumps(obj: Any) -> str:
+    """Serialize `obj` to a compact json string. Uses orjson if installed (`pip install hsbt[speedups]`), stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+def json_dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serialize `obj` to utf-8 encoded json. With `indent` the output is indented by two spaces and ends with a newline."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE if indent else 0
+        return orjson.dumps(obj, default=str, option=option)
+    if indent:
+        return (json.dumps(obj, default=str, indent=2) + "\n").encode()
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+def json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def download_file(
     url: str, target: Union[str, Path, BinaryIO]
 ) -> Union[Path, BinaryIO]:
+    import requests
+
     close_file_obj = True
     final_target_path = None
     if isinstance(target, str):
-        target = Path(str)
+        target = Path(target)
     if isinstance(target, Path):
         if target.is_dir():
             local_filename = url.split("/")[-1]
@@ -34,17 +77,40 @@ def download_file(
     else:
         close_file_obj = False
 
-    with requests.get(url, stream=True) as r:
-        r.raise_for_status()
-        for chunk in r.iter_content(chunk_size=8192):
-            target.write(chunk)
+    try:
+        with requests.get(url, stream=True) as r:
+            r.raise_for_status()
+            # let urllib3 undo a gzip/deflate transfer encoding, then copy in 1 MiB blocks
+            r.raw.decode_content = True
+            shutil.copyfileobj(r.raw, target, length=1024 * 1024)
+    finally:
+        if close_file_obj:
+            target.close()
     if close_file_obj:
-        close_file_obj.close()
         return final_target_path
     return target
 
 
-class FileInfo(BaseModel):
+def download_files(
+    urls_targets: Iterable[Tuple[str, Union[str, Path, BinaryIO]]],
+    concurrency: int = 8,
+) -> List[Union[Path, BinaryIO]]:
+    """`download_file` for many `(url, target)` pairs, with up to `concurrency` downloads running at the same time"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    urls_targets = list(urls_targets)
+    if not urls_targets:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(urls_targets)))
+    ) as executor:
+        return list(
+            executor.map(lambda url_target: download_file(*url_target), urls_targets)
+        )
+
+
+@dataclass(slots=True)
+class FileInfo:
     type_: str
     permissions: str
     hardlink_no: str
@@ -56,6 +122,10 @@ class FileInfo(BaseModel):
 
 
 class FileInfoCollection(dict[str, FileInfo]):
+    @classmethod
+    def from_iter(cls, file_infos: Iterable[FileInfo]) -> "FileInfoCollection":
+        return cls((file.name, file) for file in file_infos)
+
     def get_file_info(self, name: str, default=None) -> FileInfo:
         return self.get(name, default)
 
@@ -76,57 +146,42 @@ def cast_path(path: str | Path | List[str]) -> Path:
 
 
 def parse_ls_l_output(ls_output: str) -> FileInfoCollection:
-    def extract_file_name(ls_line: str) -> str:
-        if "'" in ls_line:
-            return ls_line.split("'")[1]
-        else:
-            return ls_line.split(" ")[-1]
-
     """expecting `ls -l` from hetzner storage box format"""
-    data = []
-    files = FileInfoCollection()
-    lines = ls_output.split("\n")
+    return FileInfoCollection.from_iter(iter_ls_l_output(ls_output.splitlines()))
+
+
+def iter_ls_l_output(lines: Iterable[str]) -> Iterator[FileInfo]:
+    """Parse `ls -l` output (hetzner storage box format) line by line. `lines` can be a stream, e.g. from `iter_command_lines`"""
+
     for line in lines:
         if not line.startswith("total ") and len(line) > 10:
-            file_name = extract_file_name(line)
-            while "  " in line:
-                line = line.replace("  ", " ")
-            data: List[str] = line.split(" ", 9)
-            # remove empty values (happens when ls creates indentations)
-            data = [i for i in data if i != ""]
+            # split on whitespace runs, the 9th field keeps the rest of the line (the file name, can contain spaces)
+            data: List[str] = line.split(None, 8)
             if len(data) == 9:
-                # seperate persmmision from file type
-                data = [data[0][0], data[0][1:]] + data[1:]
-                # pull date string
-                data = data[:6] + [" ".join(data[6:9])] + [data[-1]]
-                file = FileInfo(
-                    type_=data[0],
-                    permissions=data[1],
-                    hardlink_no=data[2],
-                    owner=data[3],
-                    group=data[4],
-                    size=data[5],
-                    date=data[6],
+                file_name = data[8]
+                if len(file_name) > 1 and file_name[0] == file_name[-1] == "'":
+                    file_name = file_name[1:-1]
+                yield FileInfo(
+                    # seperate persmmision from file type
+                    type_=data[0][0],
+                    permissions=data[0][1:],
+                    hardlink_no=data[1],
+                    owner=data[2],
+                    group=data[3],
+                    size=data[4],
+                    date=f"{data[5]} {data[6]} {data[7]}",
                     name=file_name,
                 )
-                files[file.name] = file
             else:
                 raise ValueError(
-                    f"Could not parse `ls -l` output. Expected 9 columns per line got {len(data)}. input data: \n {lines}"
+                    f"Could not parse `ls -l` output. Expected 9 columns per line got {len(data)}. line: \n {line}"
                 )
-    return files
 
 
 def convert_df_output_to_dict(df_output):
-    lines = df_output.strip().split("\n")
-    headers = lines[0].split()
-    devices = []
-
-    for line in lines[1:]:
-        values = line.split()
-        device = dict(zip(headers, values))
-        devices.append(device)
-    return devices
+    lines = df_output.strip().splitlines()
+    headers = tuple(lines[0].split())
+    return [dict(zip(headers, line.split())) for line in lines[1:] if line]
 
 
 def unzip_file(zip_file: Union[str, Path, BinaryIO], target_dir: Path):
@@ -134,66 +189,107 @@ def unzip_file(zip_file: Union[str, Path, BinaryIO], target_dir: Path):
         zip_ref.extractall(target_dir)
 
 
+def write_file_atomic(target_file: str | Path, data: bytes, new_file_mode: int = 0o644):
+    """Replace the content of `target_file` all at once. Mode and owner of an existing file are kept, a new file gets `new_file_mode`"""
+    # replace the file the path points to, a symlinked file stays a symlink
+    real_target = Path(target_file).resolve()
+    real_target.parent.mkdir(parents=True, exist_ok=True)
+    # write to a unique sibling file and swap it in, so an interrupted write never leaves a truncated file behind
+    fd, tmp_path = tempfile.mkstemp(
+        dir=real_target.parent, prefix=f".{real_target.name}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            existing = os.stat(real_target)
+        except FileNotFoundError:
+            existing = None
+        if existing is None:
+            os.chmod(tmp_path, new_file_mode)
+        else:
+            os.chmod(tmp_path, existing.st_mode & 0o7777)
+            if (existing.st_uid, existing.st_gid) != (os.getuid(), os.getgid()):
+                try:
+                    os.chown(tmp_path, existing.st_uid, existing.st_gid)
+                except PermissionError:
+                    log.debug(
+                        f"Could not keep owner of '{real_target}', it will be owned by the current user"
+                    )
+        os.replace(tmp_path, real_target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 import sys
 
+# characters that make a command line depend on shell parsing (pipes, redirects, expansions, globs, comments)
+_SHELL_METACHARACTERS = frozenset("|&;<>()$`\\*?[]{}~#!\n")
 
-@dataclass
-class ProcessOutput:
-    command: str
-    stdout_lines: List[str] = field(default_factory=list)
-    stdout_current: str = ""
-    stderr: List[str] = field(default_factory=list)
-    return_code: str = None
-    error_for_raise: ChildProcessError = None
+# commands that only exist inside a shell, there is no binary to exec
+_SHELL_BUILTINS = frozenset(
+    ". : alias bg break cd command continue eval exec exit export fg getopts hash jobs read readonly"
+    " return set shift source times trap type ulimit umask unalias unset wait".split()
+)
 
 
-def open_process(
-    command: Union[List[str], str],
-    extra_envs: Dict[str, str] = None,
-    raise_error: bool = True,
-) -> Generator[ProcessOutput, None, None]:
-    env = os.environ.copy()
-    if extra_envs:
-        env = env | extra_envs
+def _needs_shell(command: str) -> bool:
+    if not _SHELL_METACHARACTERS.isdisjoint(command):
+        return True
+    # an empty command line is a no-op for the shell, but nothing to exec
+    if not command.strip():
+        return True
+    first_word = command.split(None, 1)[0]
+    # leading `VAR=value` assignments are a shell feature as well
+    return "=" in first_word or first_word in _SHELL_BUILTINS
+
 
+def _get_process_env(extra_envs: Dict[str, str] = None) -> Dict[str, str] | None:
+    # `None` lets the child inherit our environment as it is, no copy needed
+    return {**os.environ, **extra_envs} if extra_envs else None
+
+
+def _prepare_command(
+    command: Union[List[str], str],
+) -> Tuple[str, Union[List[str], str]]:
+    """Returns the printable command and the Popen args. A str as args means it has to run through a shell"""
+    # argv lists are executed directly without a shell in between
+    # plain strings are shell command lines, but only need a shell if they use shell features
     if isinstance(command, str):
-        command = [command]
-    output = ProcessOutput(command=" ".join(command))
-
-    process = subprocess.Popen(
-        args=command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        shell=True,
-        env=env,
-    )
-    while True:
-        if output.stdout_current:
-            output.stdout_lines.append(output.stdout_current)
-            output.stdout_current = None
-        process.poll()
-        if process.returncode is not None:
-            break
+        return command, command if _needs_shell(command) else shlex.split(command)
+    return shlex.join(command), command
+
+
+def _read_stderr_file(stderr_file: BinaryIO) -> str:
+    stderr_file.seek(0)
+    return stderr_file.read().decode().strip()
 
-        output.stdout_current = process.stdout.readline().decode().strip()
-        if output.stdout_current:
-            yield output
-    output.stderr = process.stderr.read().decode().strip()
-    process.wait()
-    output.return_code = process.returncode
-    if output.return_code != 0:
-        tail_stdout = []
-        for l in reversed(output.stdout_lines):
-            if l.strip():
-                tail_stdout.insert(0, l)
-            if len(tail_stdout) == 5:
-                break
-        tail_stdout = "\n".join(tail_stdout)
-        e_msg = f"""Command '{output.command}'. ErrorCode: {output.return_code} {'stderr:' + os.linesep + output.stderr if output.stderr else ''} {os.linesep + 'tail (5 lines) of stdout:' + os.linesep + tail_stdout if tail_stdout else ''}"""
-        output.error_for_raise = ChildProcessError(e_msg)
-        if raise_error:
-            raise output.error_for_raise
-    yield output
+
+_ERROR_MESSAGE_STDERR_LIMIT = 4096
+
+
+def _get_command_error(
+    command: str, return_code: int, stderr: str, stdout_lines: List[str]
+) -> ChildProcessError:
+    tail_stdout = []
+    for l in reversed(stdout_lines):
+        if l.strip():
+            tail_stdout.insert(0, l)
+        if len(tail_stdout) == 5:
+            break
+    tail_stdout = "\n".join(tail_stdout)
+    if stderr and len(stderr) > _ERROR_MESSAGE_STDERR_LIMIT:
+        # keep exception messages readable, the full stderr still ends up in the debug log
+        log.debug(f"Full stderr of command '{command}':{os.linesep}{stderr}")
+        stderr = stderr[:_ERROR_MESSAGE_STDERR_LIMIT] + " [...]"
+    e_msg = f"""Command '{command}'. ErrorCode: {return_code} {'stderr:' + os.linesep + stderr if stderr else ''} {os.linesep + 'tail (5 lines) of stdout:' + os.linesep + tail_stdout if tail_stdout else ''}"""
+    return ChildProcessError(e_msg)
 
 
 @dataclass
@@ -209,19 +305,89 @@ def run_command(
     command: Union[List[str], str],
     extra_envs: Dict[str, str] = None,
     raise_error: bool = True,
+    stdin_data: bytes = None,
 ) -> CommandResult:
-    process_output = None
-    for output in open_process(
-        command=command, extra_envs=extra_envs, raise_error=raise_error
-    ):
-        process_output = output
-    return CommandResult(
-        command=process_output.command,
-        stdout="\n".join(process_output.stdout_lines),
-        stderr=process_output.stderr,
-        return_code=output.return_code,
-        error_for_raise=output.error_for_raise,
+    # no caller watches the output while the command runs, collect it in one go and decode it once (`iter_command_lines` is the streaming variant)
+    command_str, args = _prepare_command(command)
+    process = subprocess.run(
+        args,
+        input=stdin_data,
+        capture_output=True,
+        shell=isinstance(args, str),
+        env=_get_process_env(extra_envs),
+    )
+    stdout_lines = [
+        line.strip() for line in process.stdout.decode().splitlines() if line.strip()
+    ]
+    result = CommandResult(
+        command=command_str,
+        stdout="\n".join(stdout_lines),
+        stderr=process.stderr.decode().strip(),
+        return_code=process.returncode,
+    )
+    if result.return_code != 0:
+        result.error_for_raise = _get_command_error(
+            result.command, result.return_code, result.stderr, stdout_lines
+        )
+        if raise_error:
+            raise result.error_for_raise
+    return result
+
+
+def iter_command_lines(
+    command: List[str],
+    extra_envs: Dict[str, str] = None,
+    raise_error: bool = True,
+) -> Iterator[str]:
+    """Yield the non empty stdout lines of an argv command while it runs, instead of collecting the whole output first"""
+    env = _get_process_env(extra_envs)
+    with tempfile.TemporaryFile() as stderr_file:
+        with subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=stderr_file, env=env
+        ) as process:
+            for line in process.stdout:
+                line = line.decode().strip()
+                if line:
+                    yield line
+        stderr = _read_stderr_file(stderr_file)
+    if process.returncode != 0 and raise_error:
+        raise _get_command_error(shlex.join(command), process.returncode, stderr, [])
+
+
+async def run_command_async(
+    command: List[str],
+    extra_envs: Dict[str, str] = None,
+    raise_error: bool = True,
+    stdin_data: bytes = None,
+) -> CommandResult:
+    """`run_command` for asyncio callers. Independent commands can be awaited together (e.g. with `asyncio.gather`) and overlap their spawn and network wait."""
+    env = _get_process_env(extra_envs)
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        stdin=asyncio.subprocess.PIPE if stdin_data is not None else None,
+        env=env,
+    )
+    stdout, stderr = await process.communicate(stdin_data)
+    result = CommandResult(
+        command=shlex.join(command),
+        stdout="\n".join(
+            line.strip() for line in stdout.decode().splitlines() if line.strip()
+        ),
+        stderr=stderr.decode().strip(),
+        return_code=process.returncode,
     )
+    if result.return_code != 0:
+        result.error_for_raise = _get_command_error(
+            result.command,
+            result.return_code,
+            result.stderr,
+            result.stdout.splitlines(),
+        )
+        if raise_error:
+            raise result.error_for_raise
+    return result
 
 
 class ConfigEntryExistsError(Exception):
@@ -251,89 +417,75 @@ class ConfigFileEditor:
         self.source_hint = source_hint
         self.create_file_if_not_exists = create_file_if_not_exists
         self.create_mode = create_mode
+        # file state shared by all calls inside `batch()`
+        self._batch_file: ConfigFileEditor.ConfigFile | None = None
+        self._batch_changed: bool = False
 
     class ConfigFile:
-        class Line:
-            def __init__(
-                self, content: str, file: "ConfigFileEditor.ConfigFile" = None
-            ):
-                self.content = content
-                self.file = file
-                self.removed = False
-
-            def remove(self):
-                self.removed = True
-
-            def is_(self, val: str):
-                return self.content == val
-
-            @property
-            def number(self):
-                return self.file.lines.index(self)
-
-            def insert_after(
-                self,
-                lines: Union[
-                    str,
-                    "ConfigFileEditor.ConfigFile.Line",
-                    List[Union[str, "ConfigFileEditor.ConfigFile.Line"]],
-                ],
-            ):
-                if not isinstance(lines, list):
-                    lines = [lines]
-                self.file.insert_lines(lines, self.number)
-
-            def is_last(self):
-                return self.number + 1 == len(self.file.lines)
+        """Lines of a config file as plain strings. `removed` marks (parallel to `lines`) the lines that are dropped on save"""
 
         def __init__(self, path: Path):
             self.path = path
-            self.lines: List[ConfigFileEditor.ConfigFile.Line] = []
+            self.lines: List[str] = []
+            self.removed = bytearray()
             self.cursor: int = None
-            self.current_line = None
+            # index of the line last returned by `next_line`
+            self.current_line: int | None = None
             self.record: bool = True
 
         def read(self):
             with open(self.path, "r") as file:
-                for line in file.readlines():
-                    self.lines.append(
-                        ConfigFileEditor.ConfigFile.Line(line.strip("\n"), self)
-                    )
+                self.lines = file.read().split("\n")
+            if self.lines[-1] == "":
+                # the trailing newline does not start another line
+                self.lines.pop()
+            self.removed = bytearray(len(self.lines))
             self.cursor = 0
 
-        def next_line(self) -> Line:
-            if not self.record and self.current_line:
-                self.current_line.remove()
-            self.current_line = self.lines[self.cursor]
+        def next_line(self) -> int:
+            """Move to the next line and return its index. Lines passed while `record` is False are removed"""
+            if not self.record and self.current_line is not None:
+                self.remove(self.current_line)
+            self.current_line = self.cursor
             self.cursor += 1
             return self.current_line
 
-        def insert_line(self, line: Union[str, Line], index: int):
-            if isinstance(line, str):
-                line = ConfigFileEditor.ConfigFile.Line(line, self)
-            elif not isinstance(line, ConfigFileEditor.ConfigFile.Line):
-                raise ValueError(
-                    f"Expected 'ConfigFileEditor.ConfigFile.Line' or string type. Got {type(line)}, {line}"
-                )
-            self.lines.insert(index, line)
-            self.cursor += 1
+        def remove(self, index: int):
+            self.removed[index] = 1
 
-        def insert_lines(self, lines: List[Union[str, Line]], index: int):
-            for no, line in enumerate(lines):
-                self.insert_line(line, index + no)
+        def insert_lines(self, lines: List[str], index: int):
+            self.lines[index:index] = lines
+            self.removed[index:index] = bytes(len(lines))
+            self.cursor += len(lines)
+            if self.current_line is not None and index <= self.current_line:
+                self.current_line += len(lines)
 
-        def attach_lines(self, lines: List[Union[str, Line]]):
-            for line in lines:
-                self.insert_line(line, len(self.lines))
+        def attach_lines(self, lines: List[str]):
+            self.insert_lines(lines, len(self.lines))
+
+        def is_last(self) -> bool:
+            """True if the current line is the last line of the file"""
+            return self.cursor == len(self.lines)
 
         def is_empty(self):
             return len(self.lines) == 0
 
+        def rewind(self):
+            """Drop removed lines and move the cursor back to the start, so the file can be walked again"""
+            self.lines = [
+                line for line, removed in zip(self.lines, self.removed) if not removed
+            ]
+            self.removed = bytearray(len(self.lines))
+            self.cursor = 0
+            self.current_line = None
+            self.record = True
+
         def save(self):
+            contents = [
+                line for line, removed in zip(self.lines, self.removed) if not removed
+            ]
             with open(self.path, "w") as file:
-                file.writelines(
-                    line.content + "\n" for line in self.lines if not line.removed
-                )
+                file.write("\n".join(contents) + "\n" if contents else "")
 
     def _validate_and_prepare_target(self, supress_creating: bool = False):
         if self.target_file.is_dir():
@@ -351,26 +503,47 @@ class ConfigFileEditor:
         elif not self.target_file.exists() and not self.create_file_if_not_exists:
             raise ValueError(f"Target file {self.target_file} does not exist.")
 
+    @contextmanager
+    def batch(self):
+        """Read the target file once, apply all `set_config_entry`/`remove_config_entry` calls inside the context to it and write it once at the end (only if something changed)"""
+        self._validate_and_prepare_target()
+        self._batch_file = ConfigFileEditor.ConfigFile(path=self.target_file)
+        self._batch_file.read()
+        self._batch_changed = False
+        try:
+            yield self
+            if self._batch_changed:
+                self._batch_file.save()
+        finally:
+            self._batch_file = None
+
+    def _get_config_file(self) -> "ConfigFileEditor.ConfigFile":
+        if self._batch_file is not None:
+            self._batch_file.rewind()
+            return self._batch_file
+        file = ConfigFileEditor.ConfigFile(path=self.target_file)
+        file.read()
+        return file
+
     def get_config_entry(self, identifier) -> List[str]:
         start_delimiter: str = self._get_start_delimiter(identifier=identifier)
         end_delimiter: str = self._get_end_delimiter(identifier=identifier)
-        if not self.target_file.exists():
+        if self._batch_file is None and not self.target_file.exists():
             return []
-        file = ConfigFileEditor.ConfigFile(path=self.target_file)
-        file.read()
+        file = self._get_config_file()
         if file.is_empty():
             return []
         result = []
         cursor_in_entry: bool = False
         while True:
-            line = file.next_line()
-            if line.is_(end_delimiter):
+            line = file.lines[file.next_line()]
+            if line == end_delimiter:
                 cursor_in_entry = False
             if cursor_in_entry:
-                result.append(line.content)
-            if line.is_(start_delimiter):
+                result.append(line)
+            if line == start_delimiter:
                 cursor_in_entry = True
-            if line.is_last():
+            if file.is_last():
                 break
         return result
 
@@ -378,43 +551,84 @@ class ConfigFileEditor:
         self,
         content: Union[str, List[str]],
         identifier: str,
-    ):
-        self._validate_and_prepare_target(supress_creating=not bool(content))
+    ) -> bool:
+        """Insert/update/remove (`content=None`) the entry. Returns False and leaves the file untouched if the entry is already as requested."""
+        if self._batch_file is None:
+            self._validate_and_prepare_target(supress_creating=not bool(content))
         if content and not isinstance(content, list):
             content = [content]
         start_delimiter: str = self._get_start_delimiter(identifier=identifier)
         end_delimiter: str = self._get_end_delimiter(identifier=identifier)
 
-        file = ConfigFileEditor.ConfigFile(path=self.target_file)
-        file.read()
+        file = self._get_config_file()
         content_inserted: bool = False
+        # lines of the existing entry. None if there is no entry yet
+        existing_content: List[str] | None = None
         if not file.is_empty():
             while True:
-                line = file.next_line()
-                if line.is_(start_delimiter):
-                    line.remove()
+                index = file.next_line()
+                line = file.lines[index]
+                if line == start_delimiter:
+                    file.remove(index)
                     file.record = False
-                if line.is_(end_delimiter):
-                    line.remove()
+                    existing_content = []
+                elif not file.record and line != end_delimiter:
+                    existing_content.append(line)
+                if line == end_delimiter:
+                    file.remove(index)
                     file.record = True
                     if content:
-                        line.insert_after([start_delimiter] + content + [end_delimiter])
+                        file.insert_lines(
+                            [start_delimiter] + content + [end_delimiter], index
+                        )
                     content_inserted = True
-                if line.is_last():
+                if file.is_last():
                     break
+        if existing_content == content:
+            return False
         if not content_inserted and content:
             file.attach_lines([start_delimiter] + content + [end_delimiter])
-        file.save()
-        return
+        if self._batch_file is not None:
+            self._batch_changed = True
+        else:
+            file.save()
+        return True
 
-    def remove_config_entry(self, identifier: str):
-        self.set_config_entry(content=None, identifier=identifier)
+    def remove_config_entry(self, identifier: str) -> bool:
+        return self.set_config_entry(content=None, identifier=identifier)
 
     def _get_start_delimiter(self, identifier: str):
-        return f"{self.line_comment_line_delimiter} <{self.source_hint} '{self.base_identifier}/{identifier}'>"
+        return _get_config_entry_delimiters(
+            self.line_comment_line_delimiter,
+            self.source_hint,
+            self.base_identifier,
+            identifier,
+        )[0]
 
     def _get_end_delimiter(self, identifier: str):
-        return f"{self.line_comment_line_delimiter} </{self.source_hint} '{self.base_identifier}/{identifier}'>"
+        return _get_config_entry_delimiters(
+            self.line_comment_line_delimiter,
+            self.source_hint,
+            self.base_identifier,
+            identifier,
+        )[1]
+
+
+@functools.lru_cache(maxsize=128)
+def _get_config_entry_delimiters(
+    line_comment_line_delimiter: str,
+    source_hint: str,
+    base_identifier: str,
+    identifier: str,
+) -> Tuple[str, str]:
+    return (
+        sys.intern(
+            f"{line_comment_line_delimiter} <{source_hint} '{base_identifier}/{identifier}'>"
+        ),
+        sys.intern(
+            f"{line_comment_line_delimiter} </{source_hint} '{base_identifier}/{identifier}'>"
+        ),
+    )
 
 
 class RequirementMissing(Exception):
@@ -16,9 +16,9 @@ setup(
     url="",
     author="Tim Bleimehl",
     license="MIT",
-    packages=["hsbt"],
-    install_requires=["pydantic", "click","pyaml","requests"],
-    extras_require={"test": []},
+    packages=["hsbt", "hsbt.commands"],
+    install_requires=["click","pyaml","requests"],
+    extras_require={"test": [], "speedups": ["orjson"]},
     python_requires=">=3.10",
     zip_safe=False,
     include_package_data=True,
@@ -0,0 +1,43 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from hsbt.connection_manager import ConnectionManager
+
+CONNECTION_WITH_EXTRA_KEY = {
+    "identifier": "box",
+    "host": "u1.your-storagebox.de",
+    "user": "u1",
+    "key_dir": "/keys",
+    "comment": "written by another hsbt version",
+}
+
+
+class ConnectionConfigExtraKeysTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.tmp_dir.name, "connections.json")
+        self.config_file.write_text(
+            json.dumps({"connections": {"box": CONNECTION_WITH_EXTRA_KEY}})
+        )
+        self.conman = ConnectionManager(target_config_file=self.config_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_connection_ignores_unknown_keys(self):
+        con = self.conman.get_connection(
+            "box", from_specific_config_file=self.config_file
+        )
+        self.assertEqual(
+            (con.host, con.user, con.key_dir), ("u1.your-storagebox.de", "u1", "/keys")
+        )
+
+    def test_list_connections_ignores_unknown_keys(self):
+        cons = self.conman.list_connections(self.config_file)
+        self.assertEqual(list(cons.connections), ["box"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from hsbt.utils import _prepare_command, run_command
+
+
+class PrepareCommandTest(unittest.TestCase):
+    def test_plain_command_is_exec_directly(self):
+        self.assertEqual(
+            _prepare_command("ls -la 'a b'"), ("ls -la 'a b'", ["ls", "-la", "a b"])
+        )
+
+    def test_argv_list_is_exec_directly(self):
+        self.assertEqual(_prepare_command(["ls", "a b"]), ("ls 'a b'", ["ls", "a b"]))
+
+    def test_shell_builtins_keep_the_shell(self):
+        for command in ("cd /", "exit 1", "export X", "  source x"):
+            self.assertEqual(_prepare_command(command), (command, command))
+
+    def test_empty_commands_keep_the_shell(self):
+        for command in ("", "   "):
+            self.assertEqual(_prepare_command(command), (command, command))
+
+
+class RunCommandTest(unittest.TestCase):
+    def test_shell_builtin(self):
+        self.assertEqual(run_command("cd /").return_code, 0)
+        self.assertEqual(run_command("exit 3", raise_error=False).return_code, 3)
+
+    def test_empty_command(self):
+        self.assertEqual(run_command("").return_code, 0)
+        self.assertEqual(run_command("   ").return_code, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()